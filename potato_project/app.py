@@ -1,35 +1,255 @@
 import os
-from flask import Flask, render_template, request, redirect, url_for, jsonify, session, flash
+import mimetypes
+import sqlite3
+import threading
+from flask import (
+    Flask, Response, request, redirect, url_for, jsonify, session, flash, send_file, abort,
+    has_request_context, stream_with_context, make_response, render_template, g
+)
+from flask.cli import AppGroup
+import click
+from werkzeug.security import safe_join
+from werkzeug.middleware.proxy_fix import ProxyFix
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.utils import secure_filename
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, load_only, joinedload
 import json
-from flask_bcrypt import Bcrypt
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
+from cache import PageCache, LRUBackend
+from nutrition import NutritionEngine
+from auth import PasswordPool, PasswordPoolBusy, AttemptThrottle, IdentityCache, UserSnapshot
+from images import ImagePipeline, save_upload, photo_variants
+from assets import build_assets, load_manifest, pick_encoding
+from search import search_recipes, reindex_recipes
+from migrations import (
+    run_migrations, sync_recipe_ingredients, rebuild_review_counters, read_versions, bump_recipe_versions,
+    bump_catalog_version
+)
+from catalog import CatalogError, import_recipes, export_recipes
+from i18n import load_catalogs, localized, LocalizedTemplates
+from metrics import MetricsRegistry, install_metrics, OptInProfiler
+from conditional import conditional_get, last_modified_from_timestamp
+from pantry import PantryIndex
+from similar import SimilarRecipes, build_vectors
+from offline import BUNDLE_FIELDS, build_bundle, build_menu, cache_version
+from events import BroadcastHub, HubFull
+from ingest import GroupCommitQueue, IngestQueueFull
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import partial
+import time
 
 # --- 1. Конфігурація ---
 app = Flask(__name__)
-app.secret_key = 'super-secret-key-change-this-to-something-random' 
+# Ключ лише для розробки; wsgi.create_app() не запуститься з ним поза debug-режимом
+DEV_SECRET_KEY = 'super-secret-key-change-this-to-something-random'
+app.secret_key = DEV_SECRET_KEY
 
 basedir = os.path.abspath(os.path.dirname(__file__))
 
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(basedir, 'recipes.db')
+# WAL дозволяє читати сторінки паралельно із записом відгуків (без "database is locked"),
+# а synchronous=NORMAL у режимі WAL робить fsync лише на checkpoint
+app.config['SQLITE_PRAGMAS'] = {
+    # Єдине місце, де задається очікування блокування (мс) замість миттєвого "database is locked";
+    # timeout у connect_args не задаємо - PRAGMA після підключення його однаково перекриває.
+    # Запас - на пачки імпорту каталогу, що тримають запис секундами. Першим, бо
+    # вже journal_mode може чекати на блокування
+    'busy_timeout': 30000,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -64000,  # від'ємне значення - у КБ, тобто ~64 МБ
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY'
+}
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    'pool_size': 10,
+    'max_overflow': 10,
+    'pool_timeout': 30,
+    'connect_args': {'check_same_thread': False}
+}
 app.config['UPLOAD_FOLDER'] = os.path.join(basedir, 'static/uploads')
+app.config['ASSETS_FOLDER'] = os.path.join(basedir, 'static/dist')
+# Початкові рецепти (JSON Lines, див. catalog.py) і розмір пачки для імпорту/експорту
+app.config['SEED_FILE'] = os.path.join(basedir, 'data', 'recipes.jsonl')
+app.config['CATALOG_BATCH_SIZE'] = 5000
+# Каталоги перекладів: translations/<мова>.json
+app.config['TRANSLATIONS_FOLDER'] = os.path.join(basedir, 'translations')
+app.config['DEFAULT_LANGUAGE'] = 'uk'
+app.config['ASSETS_BUILD_ON_STARTUP'] = True
+app.config['ASSETS_MAX_AGE'] = 365 * 24 * 3600
 app.config['ALLOWED_EXTENSIONS'] = {'png', 'jpg', 'jpeg', 'gif'}
+app.config['REVIEWS_PAGE_SIZE'] = 10
+app.config['REVIEWS_MAX_PAGE_SIZE'] = 50
+# SSE-стріми нових відгуків: кожен відкритий стрім займає потік воркера
+# (див. threads у gunicorn.conf.py), тому їх кількість на процес обмежена
+app.config['REVIEW_STREAM_MAX_CONNECTIONS'] = 64  # під gunicorn - threads - 2 (див. gunicorn.conf.py)
+app.config['REVIEW_STREAM_BUFFER'] = 16
+app.config['REVIEW_STREAM_HEARTBEAT'] = 15  # секунд між keepalive (і перевірками бази)
+app.config['REVIEW_STREAM_MAX_SECONDS'] = 300  # далі EventSource сам перепідключиться
+# 'sync' - відгук зберігається власним commit у запиті; 'queue' - через чергу,
+# яку потік-записувач зберігає пачками (груповий commit, див. ingest.py)
+app.config['REVIEW_WRITE_MODE'] = 'sync'
+# Для 'queue': 'commit' - відповідь лише після commit пачки з відгуком (нічого не
+# губиться), 'accept' - одразу після постановки в чергу (при падінні процесу
+# відгуки, що ще чекали в черзі, втрачаються)
+app.config['REVIEW_QUEUE_DURABILITY'] = 'commit'
+app.config['REVIEW_QUEUE_MAX_PENDING'] = 1000
+app.config['REVIEW_QUEUE_BATCH_SIZE'] = 200
+app.config['REVIEW_QUEUE_FLUSH_INTERVAL'] = 0.05  # секунд очікування, поки пачка набирається
+app.config['REVIEW_QUEUE_COMMIT_TIMEOUT'] = 5
+app.config['PAGE_CACHE_ENABLED'] = True
+app.config['PAGE_CACHE_SIZE'] = 512
+app.config['CALCULATE_MAX_ITEMS'] = 500
+app.config['CALCULATE_MAX_PORTIONS'] = 1000  # на один рецепт у запиті
+app.config['SEARCH_MAX_RESULTS'] = 20
+app.config['PANTRY_MAX_RESULTS'] = 20
+app.config['POPULAR_MAX_RESULTS'] = 50
+# "Вам також може сподобатися": k найсхожіших рецептів на кожен, пораховані заздалегідь
+# (див. similar.py); файл спільний для всіх воркерів і відкривається через mmap
+app.config['SIMILAR_FILE'] = os.path.join(basedir, 'data', 'similar.npy')
+app.config['SIMILAR_TOP_K'] = 6
+app.config['SIMILAR_FEATURE_DIM'] = 1024
+# Service worker (/service-worker.js): оболонка, стилі й пакет рецептів кожною мовою
+# доступні без мережі, відгуки без зв'язку надсилаються пізніше (Background Sync)
+app.config['OFFLINE_ENABLED'] = True
+app.config['BCRYPT_LOG_ROUNDS'] = 12
+app.config['PASSWORD_POOL_WORKERS'] = 2  # 0 - хешувати прямо в потоці запиту
+app.config['PASSWORD_POOL_MAX_PENDING'] = 16
+app.config['PASSWORD_POOL_TIMEOUT'] = 10
+# Ліміти спроб входу - на один процес (див. AttemptThrottle): з N воркерами gunicorn
+# зловмисник має до N разів більше спроб
+app.config['LOGIN_MAX_ATTEMPTS'] = 5  # невдалих спроб на email за вікно
+app.config['LOGIN_IP_MAX_ATTEMPTS'] = 20  # невдалих входів / реєстрацій з однієї IP за вікно
+app.config['LOGIN_WINDOW_SECONDS'] = 300
+# Скільки проксі (nginx, балансувальник) стоїть перед gunicorn. Лише їм віримо
+# X-Forwarded-For: без проксі всі клієнти мали б IP проксі і ділили б один ліміт
+# спроб, а з довірою до будь-якого заголовка ліміт обходився б підробленим X-Forwarded-For
+app.config['PROXY_FIX_HOPS'] = 0
+app.config['USER_CACHE_SIZE'] = 10000
+app.config['USER_CACHE_TTL'] = 60  # секунд; стільки інші воркери можуть бачити старе ім'я
+# Знімок профілю в (підписаній) cookie сесії: запити взагалі не звертаються до бази
+# за користувачем, доки знімок не старший за SESSION_PROFILE_MAX_AGE секунд
+app.config['SESSION_PROFILE_SNAPSHOT'] = False
+app.config['SESSION_PROFILE_MAX_AGE'] = 300
+# /metrics (Prometheus) і профайлер запитів із заголовком X-Profile: 1; вимкнені - без накладних витрат
+app.config['METRICS_ENABLED'] = False
+app.config['PROFILER_ENABLED'] = False
+app.config['PROFILER_DIR'] = os.path.join(basedir, 'profiles')
+app.config['CONDITIONAL_GET_ENABLED'] = True  # ETag / Last-Modified і відповіді 304
+app.config['PREPARE_DB_ON_STARTUP'] = True  # міграції та початкові рецепти у wsgi.create_app()
+
+# Будь-який параметр вище можна перевизначити змінною оточення з префіксом RECIPES_
+# (значення розбираються як JSON): RECIPES_SECRET_KEY=..., RECIPES_PAGE_CACHE_SIZE=2048,
+# RECIPES_SQLALCHEMY_DATABASE_URI=..., RECIPES_SQLITE_PRAGMAS__cache_size=-128000
+app.config.from_prefixed_env('RECIPES')
+
+if app.config['PROXY_FIX_HOPS']:
+    hops = app.config['PROXY_FIX_HOPS']
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops, x_host=hops)
 
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+os.makedirs(app.config['ASSETS_FOLDER'], exist_ok=True)
 
 db = SQLAlchemy(app)
-bcrypt = Bcrypt(app)
+
+@event.listens_for(Engine, 'connect')
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    for name, value in app.config['SQLITE_PRAGMAS'].items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+    cursor.close()
+
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'index' 
 login_manager.login_message_category = 'info'
+page_cache = PageCache(LRUBackend(app.config['PAGE_CACHE_SIZE']), enabled=app.config['PAGE_CACHE_ENABLED'])
+password_pool = PasswordPool(
+    workers=app.config['PASSWORD_POOL_WORKERS'],
+    max_pending=app.config['PASSWORD_POOL_MAX_PENDING'],
+    rounds=app.config['BCRYPT_LOG_ROUNDS'],
+    timeout=app.config['PASSWORD_POOL_TIMEOUT']
+)
+email_throttle = AttemptThrottle(app.config['LOGIN_MAX_ATTEMPTS'], app.config['LOGIN_WINDOW_SECONDS'])
+ip_throttle = AttemptThrottle(app.config['LOGIN_IP_MAX_ATTEMPTS'], app.config['LOGIN_WINDOW_SECONDS'])
+identity_cache = IdentityCache(app.config['USER_CACHE_SIZE'], app.config['USER_CACHE_TTL'])
+similar_recipes = SimilarRecipes(app.config['SIMILAR_FILE'], app.config['SIMILAR_TOP_K'])
+review_hub = BroadcastHub(app.config['REVIEW_STREAM_MAX_CONNECTIONS'], app.config['REVIEW_STREAM_BUFFER'])
+image_pipeline = ImagePipeline()
+
+metrics = MetricsRegistry(enabled=app.config['METRICS_ENABLED'])
+metrics.histogram('recipes_template_render_seconds', 'Час рендерингу шаблону')
+metrics.histogram('recipes_bcrypt_seconds', 'Час bcrypt (разом з очікуванням у пулі процесів)')
+metrics.histogram('recipes_review_flush_seconds', 'Час збереження пачки відгуків з черги')
+metrics.histogram('recipes_review_flush_batch', 'Відгуків в одній пачці', (1, 2, 5, 10, 20, 50, 100, 200, 500))
+metrics.counter('recipes_review_queue_rejected_total', 'Відгуки, відхилені через повну чергу')
+
+def _page_cache_metrics():
+    stats = page_cache.stats()
+    return [
+        ('recipes_page_cache_hits_total', 'counter', 'Влучання в кеш сторінок', stats['hits']),
+        ('recipes_page_cache_misses_total', 'counter', 'Промахи кешу сторінок', stats['misses']),
+        ('recipes_page_cache_entries', 'gauge', 'Кількість сторінок у кеші', stats['size']),
+        ('recipes_user_cache_hits_total', 'counter', 'Влучання в кеш користувачів', identity_cache.hits),
+        ('recipes_user_cache_misses_total', 'counter', 'Промахи кешу користувачів', identity_cache.misses)
+    ]
+
+def _review_queue_metrics():
+    return [('recipes_review_queue_depth', 'gauge', 'Відгуків у черзі на запис', review_queue.depth())]
+
+if app.config['METRICS_ENABLED']:
+    install_metrics(app, metrics)
+    metrics.add_collector(_page_cache_metrics)
+    metrics.add_collector(_review_queue_metrics)
+if app.config['PROFILER_ENABLED']:
+    os.makedirs(app.config['PROFILER_DIR'], exist_ok=True)
+    app.wsgi_app = OptInProfiler(app.wsgi_app, app.config['PROFILER_DIR'])
+
+# Статичні файли з хешем вмісту в імені (див. assets.py); збираються при старті
+# або командою `flask build-assets`
+def build_static_assets():
+    return build_assets(app.static_folder, app.config['ASSETS_FOLDER'], skip_dirs=[app.config['UPLOAD_FOLDER']])
+
+asset_manifest = build_static_assets() if app.config['ASSETS_BUILD_ON_STARTUP'] else load_manifest(app.config['ASSETS_FOLDER'])
 
 # --- 2. МОДЕЛІ БАЗИ ДАНИХ ---
 
+# Версія формату знімка профілю в сесії: зміна полів UserSnapshot - нова версія,
+# і старі знімки просто ігноруються
+PROFILE_SNAPSHOT_VERSION = 1
+
+def session_profile(user_id):
+    snapshot = session.get('_profile')
+    if not snapshot or snapshot[0] != PROFILE_SNAPSHOT_VERSION:
+        return None
+    _, saved_at, *fields = snapshot
+    if fields[0] != user_id or time.time() - saved_at > app.config['SESSION_PROFILE_MAX_AGE']:
+        return None
+    return UserSnapshot(*fields)
+
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    # current_user - знімок (UserSnapshot), а не модель: береться з сесії чи кешу
+    # процесу, і лише за їх відсутності - одним запитом до бази
+    user_id = int(user_id)
+    snapshot_enabled = app.config['SESSION_PROFILE_SNAPSHOT']
+    user = session_profile(user_id) if snapshot_enabled else None
+    if user is not None:
+        return user
+
+    user = identity_cache.get(user_id)
+    if user is None:
+        row = db.session.query(User.id, User.email, User.first_name, User.last_name).filter_by(id=user_id).first()
+        if row is None:
+            return None
+        user = UserSnapshot(*row)
+        identity_cache.set(user)
+    if snapshot_enabled:
+        session['_profile'] = [PROFILE_SNAPSHOT_VERSION, int(time.time()), *user.to_list()]
+    return user
 
 class User(db.Model, UserMixin):
     id = db.Column(db.Integer, primary_key=True)
@@ -43,7 +263,7 @@ class Recipe(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     image = db.Column(db.String(100), nullable=False)
     base_portions = db.Column(db.Integer, nullable=False, default=4)
-    category = db.Column(db.String(50), nullable=False, default='classic')
+    category = db.Column(db.String(50), nullable=False, default='classic', index=True)
     title_uk = db.Column(db.String(100), nullable=False)
     description_uk = db.Column(db.Text, nullable=False)
     ingredients_uk = db.Column(db.JSON, nullable=False) 
@@ -52,6 +272,11 @@ class Recipe(db.Model):
     description_en = db.Column(db.Text, nullable=False)
     ingredients_en = db.Column(db.JSON, nullable=False) 
     instructions_en = db.Column(db.Text, nullable=False)
+    # Лічильники підтримуються тригерами на review (див. migrations.py), код їх не змінює
+    review_count = db.Column(db.Integer, nullable=False, default=0, server_default='0', index=True)
+    photo_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Версія панелі рецепта: відгуки та імена їх авторів (тригери, див. migrations.py)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
     reviews = db.relationship('Review', backref='recipe', lazy=True)
 
 class Review(db.Model):
@@ -59,189 +284,591 @@ class Review(db.Model):
     text = db.Column(db.Text, nullable=False)
     photo = db.Column(db.String(100), nullable=True) 
     recipe_id = db.Column(db.Integer, db.ForeignKey('recipe.id'), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+
+    # Індекс під keyset-пагінацію: WHERE recipe_id = ? AND id < ? ORDER BY id DESC
+    __table_args__ = (
+        db.Index('ix_review_recipe_id_id', 'recipe_id', 'id'),
+    )
+
+# Нормалізовані інгредієнти: рядки заповнюються тригерами з JSON-колонок рецепта
+# (див. migrations.py), тому напряму в ці таблиці код не пише
+class Ingredient(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name_uk = db.Column(db.String(100), nullable=False)
+    name_en = db.Column(db.String(100), nullable=False, index=True)
+
+    __table_args__ = (
+        db.UniqueConstraint('name_uk', 'name_en', name='uq_ingredient_names'),
+    )
+
+class RecipeIngredient(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    recipe_id = db.Column(db.Integer, db.ForeignKey('recipe.id'), nullable=False)
+    ingredient_id = db.Column(db.Integer, db.ForeignKey('ingredient.id'), nullable=False, index=True)
+    position = db.Column(db.Integer, nullable=False)
+    # Кількість і БЖУ - на base_portions порцій рецепта, спільні для всіх мов
+    amount = db.Column(db.Float, nullable=False, default=0)
+    unit_uk = db.Column(db.String(30), nullable=True)
+    unit_en = db.Column(db.String(30), nullable=True)
+    p = db.Column(db.Float, nullable=False, default=0)
+    f = db.Column(db.Float, nullable=False, default=0)
+    c = db.Column(db.Float, nullable=False, default=0)
+    ingredient = db.relationship('Ingredient', lazy=True)
+
+    __table_args__ = (
+        db.Index('ix_recipe_ingredient_recipe_id_position', 'recipe_id', 'position'),
+    )
 
 
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
 
+def get_reviews_page(recipe_id, after=None, limit=None):
+    # Сторінка відгуків від нових до старих; after - id останнього вже показаного відгуку
+    limit = min(limit or app.config['REVIEWS_PAGE_SIZE'], app.config['REVIEWS_MAX_PAGE_SIZE'])
+    query = Review.query.options(joinedload(Review.author)).filter(Review.recipe_id == recipe_id)
+    if after is not None:
+        query = query.filter(Review.id < after)
+    reviews = query.order_by(Review.id.desc()).limit(limit + 1).all()
+
+    next_after = reviews[limit - 1].id if len(reviews) > limit else None
+    return reviews[:limit], next_after
+
+@app.template_global()
+def static_url(filename):
+    # Замінник url_for('static', filename=...): для файлів з маніфесту дає адресу з хешем,
+    # яку браузер може кешувати назавжди
+    hashed = asset_manifest.get(filename)
+    if hashed:
+        return url_for('asset', filename=hashed)
+    return url_for('static', filename=filename)
+
+@app.template_global()
+def photo_srcsets(photo):
+    # Готові зменшені копії фото відгуку у вигляді атрибутів srcset ({'jpg': ..., 'webp': ...})
+    return {
+        fmt: ', '.join(f"{url_for('static', filename=path)} {width}w" for path, width in variants)
+        for fmt, variants in photo_variants(app.static_folder, photo).items()
+    }
+
+def review_to_dict(review):
+    return {
+        'id': review.id,
+        'author': review.author.first_name or review.author.email,
+        'text': review.text,
+        'photo': url_for('static', filename=review.photo) if review.photo else None,
+        'photo_srcsets': photo_srcsets(review.photo) if review.photo else {}
+    }
+
+# Ключі кешу: головна сторінка залежить від мови, каталогу (адреси меню і офлайн-пакета)
+# і конкретного користувача (ім'я в меню, форма профілю), панель рецепта - від каталогу,
+# власних відгуків (версія рецепта), мови і того, чи користувач увійшов.
+# Версії читаються з бази, тож зміна, зроблена будь-яким воркером чи командою CLI,
+# дає нові ключі лише сторінкам, яких вона стосується, а старі просто витісняє LRU.
+# Явного скидання кешу немає - воно бачило б лише записи власного процесу
+def index_cache_key(catalog_version, lang, viewer):
+    return f'index:{catalog_version}:{lang}:{viewer}'
+
+def panel_cache_key(catalog_version, recipe_version, recipe_id, lang, authenticated):
+    return f'panel:{catalog_version}:{recipe_id}:{recipe_version}:{lang}:{"auth" if authenticated else "anon"}'
+
+def current_versions(recipe_id=None):
+    # -> (версія вмісту, час її зміни, версія каталогу, версія рецепта recipe_id).
+    # Одне читання на запит: ETag і ключ кешу сторінки мають описувати той самий вміст,
+    # інакше запис з іншого процесу між двома читаннями дав би новий ETag зі старою сторінкою
+    versions = g.setdefault('versions', {})
+    if recipe_id not in versions:
+        versions[recipe_id] = read_versions(db.session, recipe_id)
+    return versions[recipe_id]
+
+def current_content_version():
+    # -> (версія вмісту, час її зміни)
+    version, updated_at, _, _ = current_versions()
+    return version, updated_at
+
+def current_catalog_version():
+    # Версія каталогу рецептів змінюється тригерами і імпортом з будь-якого процесу,
+    # тож індекси в пам'яті нижче зберігаються разом з нею і перебудовуються, щойно вона стала іншою
+    return current_versions()[2]
+
+# Рушій калькулятора будується з усіх рецептів і живе до наступної зміни каталогу.
+# Перебудовує його один потік, решта запитів чекає на замку і бере готовий
+_nutrition_engine = (None, None)
+_nutrition_engine_lock = threading.Lock()
+
+def get_nutrition_engine():
+    global _nutrition_engine
+    version = current_catalog_version()
+    if _nutrition_engine[0] != version:
+        with _nutrition_engine_lock:
+            if _nutrition_engine[0] != version:
+                recipes = db.session.query(Recipe.id, Recipe.base_portions).order_by(Recipe.id).all()
+                # Рядки інгредієнтів і суми БЖУ беруться з нормалізованих таблиць,
+                # без розбору JSON кожного рецепта
+                ingredients = db.session.query(
+                    RecipeIngredient.recipe_id, RecipeIngredient.amount,
+                    *[getattr(RecipeIngredient, f'unit_{lang}') for lang in CONTENT_LANGUAGES],
+                    *[getattr(Ingredient, f'name_{lang}') for lang in CONTENT_LANGUAGES]
+                ).join(Ingredient).join(Recipe, Recipe.id == RecipeIngredient.recipe_id).order_by(
+                    RecipeIngredient.recipe_id, RecipeIngredient.position
+                ).all()
+                macro_totals = db.session.query(
+                    RecipeIngredient.recipe_id,
+                    db.func.total(RecipeIngredient.p), db.func.total(RecipeIngredient.f), db.func.total(RecipeIngredient.c)
+                ).group_by(RecipeIngredient.recipe_id).all()
+                _nutrition_engine = (version, NutritionEngine(recipes, ingredients, macro_totals, CONTENT_LANGUAGES))
+    return _nutrition_engine[1]
+
+_pantry_index = (None, None)
+_pantry_index_lock = threading.Lock()
+
+def get_pantry_index():
+    global _pantry_index
+    version = current_catalog_version()
+    if _pantry_index[0] != version:
+        with _pantry_index_lock:
+            if _pantry_index[0] != version:
+                index = PantryIndex(CONTENT_LANGUAGES)
+                for recipe in Recipe.query.options(
+                    load_only(Recipe.id, *[getattr(Recipe, f'ingredients_{lang}') for lang in CONTENT_LANGUAGES])
+                ):
+                    index.add_recipe(recipe)
+                _pantry_index = (version, index)
+    return _pantry_index[1]
+
+# Пакети рецептів для офлайн-режиму (див. offline.py), по одному на мову.
+# Версію пакета видно без його збирання: версія каталогу з бази плюс хеш формату і
+# маніфесту статики (адреси картинок у пакеті містять хеші файлів). Тож оболонка і
+# service worker лише читають версію, а сам пакет збирається при запиті /offline/...
+BUNDLE_ASSETS_TAG = cache_version([*BUNDLE_FIELDS, *sorted(asset_manifest.values())])
+_recipe_bundles = {}
+
+def recipe_bundle_version():
+    return f'{current_catalog_version()}-{BUNDLE_ASSETS_TAG}'
+
+def get_recipe_bundle(lang):
+    version = recipe_bundle_version()
+    bundle = _recipe_bundles.get(lang)
+    if bundle is None or bundle.version != version:
+        recipes = Recipe.query.order_by(Recipe.id).yield_per(app.config['CATALOG_BATCH_SIZE'])
+        bundle = _recipe_bundles[lang] = build_bundle(
+            recipes, lang, app.config['DEFAULT_LANGUAGE'], static_url, version
+        )
+    return bundle
+
+def recipe_bundle_url(lang):
+    return url_for('recipe_bundle', lang=lang, v=recipe_bundle_version())
+
+# Меню рецептів і список калькулятора теж не вбудовуються в оболонку сторінки (вона
+# не росте з каталогом): браузер довантажує їх при першому відкритті меню. Версія -
+# каталог плюс момент запуску (формат відповіді міг змінитися з новим кодом)
+_recipe_menus = {}
+
+def recipe_menu_version():
+    return f'{current_catalog_version()}-{STARTUP_TAG}'
+
+def get_recipe_menu(lang):
+    version = recipe_menu_version()
+    menu = _recipe_menus.get(lang)
+    if menu is None or menu.version != version:
+        recipes = Recipe.query.options(
+            load_only(Recipe.id, Recipe.category, Recipe.base_portions, Recipe.title_uk, Recipe.title_en)
+        ).order_by(Recipe.id).yield_per(app.config['CATALOG_BATCH_SIZE'])
+        menu = _recipe_menus[lang] = build_menu(recipes, lang, app.config['DEFAULT_LANGUAGE'], version)
+    return menu
+
+def recipe_menu_url(lang):
+    return url_for('recipe_menu', lang=lang, v=recipe_menu_version())
+
+# Схожі рецепти: таблицю в запитах лише читаємо, а перераховують її імпорт і
+# команда rebuild-similar. Новий чи змінений поза імпортом рецепт отримає (чи
+# змінить) рекомендації після наступної перебудови
+def recipe_vectors():
+    recipes = db.session.query(Recipe.id, Recipe.category).order_by(Recipe.id).all()
+    ingredient_rows = db.session.query(RecipeIngredient.recipe_id, RecipeIngredient.ingredient_id).all()
+    macro_totals = db.session.query(
+        RecipeIngredient.recipe_id,
+        db.func.total(RecipeIngredient.p), db.func.total(RecipeIngredient.f), db.func.total(RecipeIngredient.c)
+    ).group_by(RecipeIngredient.recipe_id).all()
+    return build_vectors(recipes, ingredient_rows, macro_totals, app.config['SIMILAR_FEATURE_DIM'])
+
+def build_similar():
+    return similar_recipes.rebuild(*recipe_vectors())
+
+def get_similar(recipe_id):
+    # -> [Recipe] у порядку схожості; видалені з того часу рецепти просто відсіюються
+    neighbor_ids = [neighbor for neighbor, _ in similar_recipes.lookup(recipe_id)]
+    if not neighbor_ids:
+        return []
+    recipes = {recipe.id: recipe for recipe in Recipe.query.options(
+        load_only(Recipe.id, Recipe.title_uk, Recipe.title_en)
+    ).filter(Recipe.id.in_(neighbor_ids))}
+    return [recipes[neighbor] for neighbor in neighbor_ids if neighbor in recipes]
+
+# Змін рецептів тут не відстежуємо: ORM-хуки не бачать імпорту (Core upsert) і записів
+# з інших процесів, тому індекси в пам'яті звіряються з версією каталогу (див. вище)
+@event.listens_for(Session, 'after_rollback')
+def _forget_pending_changes(session):
+    session.info.pop('user_changes', None)
+    session.info.pop('new_reviews', None)
+
+# Нові відгуки: стріми відкритих панелей будимо один раз на commit
+# (сповіщення - найбільший id на рецепт, самі відгуки стрім дочитує з бази)
+@event.listens_for(Review, 'after_insert')
+def _remember_new_review(mapper, connection, review):
+    new_reviews = db.session.info.setdefault('new_reviews', {})
+    new_reviews[review.recipe_id] = max(review.id, new_reviews.get(review.recipe_id, 0))
+
+@event.listens_for(Session, 'after_commit')
+def _publish_new_reviews(db_session):
+    for recipe_id, review_id in db_session.info.pop('new_reviews', {}).items():
+        review_hub.publish(recipe_id, review_id)
+
+# Так само для користувачів: будь-яка зміна облікового запису через ORM
+# скидає його знімок у кеші процесу і в сесії поточного запиту
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _remember_user_change(mapper, connection, user):
+    db.session.info.setdefault('user_changes', set()).add(user.id)
+
+@event.listens_for(Session, 'after_commit')
+def _apply_user_changes(db_session):
+    changes = db_session.info.pop('user_changes', None)
+    if not changes:
+        return
+    identity_cache.invalidate(*changes)
+    if has_request_context():
+        snapshot = session.get('_profile')
+        if snapshot and snapshot[2] in changes:
+            session.pop('_profile')
+
+def save_reviews(items):
+    # Пачка відгуків з черги - одна транзакція; викликається з потоку-записувача.
+    # Сповіщення SSE-стрімам розсилає _publish_new_reviews після commit
+    with app.app_context():
+        try:
+            db.session.add_all([Review(**item) for item in items])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+def _observe_review_flush(batch_size, seconds):
+    metrics.observe('recipes_review_flush_batch', batch_size)
+    metrics.observe('recipes_review_flush_seconds', seconds)
+
+review_queue = GroupCommitQueue(
+    save_reviews,
+    max_pending=app.config['REVIEW_QUEUE_MAX_PENDING'],
+    batch_size=app.config['REVIEW_QUEUE_BATCH_SIZE'],
+    interval=app.config['REVIEW_QUEUE_FLUSH_INTERVAL'],
+    observe=_observe_review_flush,
+    name='review-writer'
+)
+
+def photo_variants_ready(recipe_id):
+    # Викликається з потоку обробки фото, поза контекстом запиту; нова версія рецепта
+    # змінює ETag і ключ кешу панелі, тож вона почне віддавати srcset
+    with app.app_context():
+        with db.engine.begin() as connection:
+            bump_recipe_versions(connection, str(int(recipe_id)))
+
 # --- 3. СЛОВНИКИ ПЕРЕКЛАДІВ (UI) ---
 
-TRANSLATIONS_UK = {
-    "app_title": "Книга рецептів",
-    "nav_title": "Книга рецептів",
-    "nav_home": "Головна",
-    "nav_classic": "Класичні рецепти",
-    "nav_world": "Картопля у світі",
-    "nav_soups": "Супи",
-    "nav_calculator": "Калькулятор",
-    "nav_login": "Увійти",
-    "nav_register": "Реєстрація",
-    "nav_logout": "Вийти",
-    "nav_profile": "Профіль",
-    "welcome_title": "Ласкаво просимо до Книги Рецептів!",
-    "welcome_text": "Будь ласка, оберіть рецепт з меню вище, щоб почати.",
-    "login_title": "Вхід",
-    "register_title": "Реєстрація",
-    "email_label": "Email",
-    "password_label": "Пароль",
-    "confirm_password_label": "Підтвердіть пароль",
-    "profile_title": "Редагувати профіль",
-    "profile_first_name": "Ім'я:",
-    "profile_last_name": "Прізвище:",
-    "profile_button_save": "Зберегти зміни",
-    "profile_overlay_title": "Ваш профіль",
-    "profile_overlay_name": "Ім'я:",
-    "profile_overlay_surname": "Прізвище:",
-    "profile_overlay_not_set": "Не вказано",
-    "profile_overlay_edit_btn": "Редагувати профіль",
-    "reviews_login_prompt": "Ви повинні увійти в акаунт, щоб залишити відгук.",
-    "calculator_title": "Калькулятор інгредієнтів",
-    "calculator_select": "Оберіть рецепт:",
-    "calculator_select_default": "-- Оберіть --",
-    "calculator_base_text_1": "Рецепт розрахований на",
-    "calculator_base_text_2": "порції.",
-    "calculator_portions_label": "Скільки порцій вам потрібно?",
-    "calculator_button": "Перерахувати",
-    "calculator_results_title_1": "Інгредієнти на",
-    "calculator_results_title_2": "порцій:",
-    "calculator_nutrition_title": "Орієнтовне БЖУ",
-    "nutrition_total": "Всього на",
-    "nutrition_protein": "Білки",
-    "nutrition_fats": "Жири",
-    "nutrition_carbs": "Вуглеводи",
-    "nutrition_unit": "г",
-    "recipe_ingredients_title": "Інгредієнти",
-    "recipe_portions": "порції",
-    "recipe_instructions": "Інструкція",
-    "reviews_title": "Залишити відгук",
-    "reviews_label_text": "Ваш відгук:",
-    "reviews_label_photo": "Прикріпити фото (необов'язково):",
-    "reviews_button": "Надіслати відгук",
-    "reviews_existing_title": "Відгуки",
-    "reviews_none": "Відгуків поки що немає. Будьте першим!",
-    "potato_greeting": "Привіт! Я твій Картопляний Друг. Оберіть рецепт!",
-    "potato_switch_tab": "О, подивимось цей рецепт!",
-    "potato_calc_many": "Ого, {portions} порцій! Це буде вечірка!",
-    "potato_calc_few": "Хм, сьогодні готуємо небагато!",
-    "potato_calc_butter": "Ого, це ДУЖЕ багато масла!",
-    "fact_1": "Чи знали ви, що до Європи картоплю спочатку завезли як декоративну рослину?",
-    "fact_2": "У Франції Антуан-Огюст Пармантьє влаштував 'рекламну кампанію', виставивши озброєну охорону біля картопляних полів.",
-    "fact_3": "Картопля стала першою овочем, вирощеним у космосі на борту шатлу 'Колумбія' у 1995 році.",
-    "ad_1": "Спробуйте рецепти з усього світу! Наприклад, Іспанську Тортилью.",
-    "ad_2": "Потрібно більше порцій? Використовуйте наш калькулятор!",
-    "flash_password_mismatch": "Паролі не співпадають!",
-    "flash_email_exists": "Користувач з таким email вже існує.",
-    "flash_login_fail": "Неправильний email або пароль."
-}
+# Тексти інтерфейсу лежать у translations/*.json; нова мова - новий файл
+catalogs = load_catalogs(app.config['TRANSLATIONS_FOLDER'], app.config['DEFAULT_LANGUAGE'])
+LANGUAGES = list(catalogs)
+# Мови, якими є самі рецепти (колонки ingredients_*, name_*, unit_*). Переклад інтерфейсу
+# ще не означає перекладу рецептів: для інших мов UI калькулятор і пошук за продуктами
+# працюють з даними мовою за замовчуванням
+CONTENT_LANGUAGES = [
+    lang for lang in LANGUAGES
+    if all(hasattr(model, f'{field}_{lang}')
+           for model, field in ((Recipe, 'ingredients'), (Ingredient, 'name'), (RecipeIngredient, 'unit')))
+]
 
-TRANSLATIONS_EN = {
-    "app_title": "Recipe Book",
-    "nav_title": "Recipe Book",
-    "nav_home": "Home",
-    "nav_classic": "Classic Recipes",
-    "nav_world": "Potatoes in the World",
-    "nav_soups": "Soups",
-    "nav_calculator": "Calculator",
-    "nav_login": "Login",
-    "nav_register": "Register",
-    "nav_logout": "Logout",
-    "nav_profile": "Profile",
-    "welcome_title": "Welcome to the Recipe Book!",
-    "welcome_text": "Please select a recipe from the menu above to get started.",
-    "login_title": "Login",
-    "register_title": "Register",
-    "email_label": "Email",
-    "password_label": "Password",
-    "confirm_password_label": "Confirm Password",
-    "profile_title": "Edit Profile",
-    "profile_first_name": "First Name:",
-    "profile_last_name": "Last Name:",
-    "profile_button_save": "Save Changes",
-    "profile_overlay_title": "Your Profile",
-    "profile_overlay_name": "Name:",
-    "profile_overlay_surname": "Surname:",
-    "profile_overlay_not_set": "Not set",
-    "profile_overlay_edit_btn": "Edit Profile",
-    "reviews_login_prompt": "You must be logged in to leave a review.",
-    "calculator_title": "Ingredient Calculator",
-    "calculator_select": "Select a recipe:",
-    "calculator_select_default": "-- Select --",
-    "calculator_base_text_1": "Recipe based on",
-    "calculator_base_text_2": "portions.",
-    "calculator_portions_label": "How many portions do you need?",
-    "calculator_button": "Recalculate",
-    "calculator_results_title_1": "Ingredients for",
-    "calculator_results_title_2": "portions:",
-    "calculator_nutrition_title": "Estimated Macros",
-    "nutrition_total": "Total for",
-    "nutrition_protein": "Protein",
-    "nutrition_fats": "Fats",
-    "nutrition_carbs": "Carbs",
-    "nutrition_unit": "g",
-    "recipe_ingredients_title": "Ingredients",
-    "recipe_portions": "portions",
-    "recipe_instructions": "Instructions",
-    "reviews_title": "Leave a review",
-    "reviews_label_text": "Your review:",
-    "reviews_label_photo": "Attach a photo (optional):",
-    "reviews_button": "Submit Review",
-    "reviews_existing_title": "Reviews",
-    "reviews_none": "No reviews yet. Be the first!",
-    "potato_greeting": "Hi! I'm your Potato Buddy. Pick a recipe!",
-    "potato_switch_tab": "Oh, let's check out this recipe!",
-    "potato_calc_many": "Wow, {portions} portions! That's a party!",
-    "potato_calc_few": "Hm, cooking just a little today!",
-    "potato_calc_butter": "Whoa, that's a LOT of butter!",
-    "fact_1": "Did you know that potatoes were first brought to Europe as an ornamental plant?",
-    "fact_2": "In France, Antoine-Augustin Parmentier ran a 'publicity campaign' by placing armed guards around potato fields.",
-    "fact_3": "The potato was the first vegetable to be grown in space aboard the Space Shuttle Columbia in 1995.",
-    "ad_1": """Try recipes from around the world!
-For example, the Spanish Tortilla.""",
-    "ad_2": "Need more portions? Use our calculator!",
-    "flash_password_mismatch": "Passwords do not match!",
-    "flash_email_exists": "A user with this email already exists.",
-    "flash_login_fail": "Incorrect email or password."
-}
+def content_lang(lang):
+    return lang if lang in CONTENT_LANGUAGES else app.config['DEFAULT_LANGUAGE']
+localized_templates = LocalizedTemplates(app.jinja_env, catalogs)
+
+def get_lang():
+    lang = session.get('lang')
+    return lang if lang in catalogs else app.config['DEFAULT_LANGUAGE']
+
+@app.template_filter('localized')
+def localized_filter(obj, field, lang):
+    return localized(obj, field, lang, app.config['DEFAULT_LANGUAGE'])
+
+@app.context_processor
+def inject_languages():
+    return {'languages': LANGUAGES}
+
+def render_localized(template_name, lang, **context):
+    # Як render_template, але шаблон береться з оточення конкретної мови,
+    # де переклади вже підставлені під час компіляції
+    context.update(t=catalogs[lang], lang=lang)
+    app.update_template_context(context)
+    with metrics.timer('recipes_template_render_seconds', template=template_name):
+        return localized_templates.get_template(template_name, lang).render(context)
+
+# ETag містить і момент запуску: після деплою нові шаблони чи код мають давати нові
+# сторінки навіть за тієї ж версії вмісту. З preload_app його обчислює майстер-процес,
+# тож у всіх воркерів він однаковий
+STARTUP_TIME = time.time()
+STARTUP_TAG = format(int(STARTUP_TIME), 'x')
+
+def user_tag():
+    # Користувач разом з полями його знімка: знімок з кешу процесу чи сесії може
+    # відставати від бази (USER_CACHE_TTL, SESSION_PROFILE_MAX_AGE), і сторінку, відрендерену
+    # зі старим ім'ям, не можна зберігати під ключем чи ETag, що переживуть оновлення знімка
+    return f'user{current_user.id}-{current_user.fingerprint()}'
+
+def viewer_tag(audience=None):
+    # audience: 'user' - сторінка своя для кожного користувача, 'auth' - залежить лише
+    # від того, чи користувач увійшов, None - однакова для всіх (з точністю до мови)
+    if audience == 'user':
+        return user_tag() if current_user.is_authenticated else 'anon'
+    if audience == 'auth':
+        return 'auth' if current_user.is_authenticated else 'anon'
+    return 'all'
+
+def page_validators(version, updated_at, audience=None):
+    # version - версія саме тих даних, з яких складається сторінка
+    if not app.config['CONDITIONAL_GET_ENABLED']:
+        return None
+    # Сторінки з flash-повідомленнями чи помилкою форми одноразові
+    if '_flashes' in session or request.args.get('error_tab'):
+        return None
+    etag = f'{STARTUP_TAG}-{version}-{get_lang()}-{viewer_tag(audience)}'
+    return etag, last_modified_from_timestamp(max(updated_at, STARTUP_TIME))
+
+def content_validators(audience=None):
+    # Сторінки, що залежать від будь-якого вмісту (пошук, комора)
+    version, updated_at = current_content_version()
+    return page_validators(version, updated_at, audience)
+
+def shell_validators():
+    # Оболонка: меню і адреси офлайн-пакета - від каталогу, решта - від знімка користувача
+    _, updated_at, catalog_version, _ = current_versions()
+    return page_validators(f'c{catalog_version}', updated_at, 'user')
+
+def recipe_validators(audience=None):
+    # Панель і відгуки рецепта: лише його власна версія і каталог
+    _, updated_at, catalog_version, recipe_version = current_versions(request.view_args['recipe_id'])
+    if recipe_version is None:
+        return None  # рецепта немає - далі буде 404
+    return page_validators(f'c{catalog_version}.r{recipe_version}', updated_at, audience)
 
 
 # --- 4. Маршрути (Логіка) ---
 @app.route('/')
+@conditional_get(shell_validators)
 def index():
-    lang = session.get('lang', 'uk')
-    translations = TRANSLATIONS_EN if lang == 'en' else TRANSLATIONS_UK
+    lang = get_lang()
 
     # Отримуємо вкладку помилки з URL
     error_tab = request.args.get('error_tab')
 
-    classic_recipes = Recipe.query.filter_by(category='classic').all()
-    world_recipes = Recipe.query.filter_by(category='world').all()
-    soup_recipes = Recipe.query.filter_by(category='soup').all() 
-    
-    all_recipes = classic_recipes + world_recipes + soup_recipes
-    
-    return render_template(
-        'index.html', 
-        classic_recipes=classic_recipes, 
-        world_recipes=world_recipes,
-        soup_recipes=soup_recipes, 
-        all_recipes=all_recipes,
-        t=translations,
-        lang=lang,
-        error_tab=error_tab  # Передаємо в шаблон
+    def render():
+        # "Оболонка" сторінки не містить даних рецептів: меню і список калькулятора
+        # довантажуються з recipe_menu(), панелі рецептів - з recipe_panel()
+        return render_localized(
+            'index.html',
+            lang,
+            menu_url=recipe_menu_url(lang),
+            error_tab=error_tab,  # Передаємо в шаблон
+            # user_id - автор відгуків, які service worker ставить у чергу без зв'язку
+            offline={
+                'bundle_url': recipe_bundle_url(lang),
+                'user_id': current_user.id if current_user.is_authenticated else None
+            } if app.config['OFFLINE_ENABLED'] else None
+        )
+
+    # Сторінки з помилками форм (flash-повідомлення) одноразові - їх не кешуємо
+    # (no-store - і service worker теж не збереже таку сторінку як оболонку)
+    if error_tab or '_flashes' in session:
+        response = make_response(render())
+        response.cache_control.no_store = True
+        return response
+
+    return page_cache.get_or_render(index_cache_key(current_catalog_version(), lang, viewer_tag('user')), render)
+
+@app.route('/recipe/<int:recipe_id>/panel')
+@conditional_get(partial(recipe_validators, 'auth'))
+def recipe_panel(recipe_id):
+    lang = get_lang()
+
+    def render():
+        # Панель рендерить лише першу сторінку відгуків (разом з авторами),
+        # решту догружає /api/recipes/<id>/reviews при прокрутці
+        recipe = Recipe.query.get_or_404(recipe_id)
+        reviews, next_after = get_reviews_page(recipe_id)
+        return render_localized(
+            'recipe.html',
+            lang,
+            recipe=recipe,
+            reviews=reviews,
+            review_count=recipe.review_count,
+            next_after=next_after,
+            similar=get_similar(recipe_id)
+        )
+
+    _, _, catalog_version, recipe_version = current_versions(recipe_id)
+    key = panel_cache_key(catalog_version, recipe_version, recipe_id, lang, current_user.is_authenticated)
+    return page_cache.get_or_render(key, render)
+
+@app.route('/api/recipes/<int:recipe_id>/reviews')
+@conditional_get(recipe_validators)
+def api_recipe_reviews(recipe_id):
+    after = request.args.get('after', type=int)
+    limit = request.args.get('limit', type=int)
+    if limit is not None and limit < 1:
+        return jsonify({'error': 'limit must be positive'}), 400
+
+    reviews, next_after = get_reviews_page(recipe_id, after=after, limit=limit)
+    return jsonify({
+        'reviews': [review_to_dict(review) for review in reviews],
+        'next_after': next_after
+    })
+
+def _sse_event(event_id, name, data):
+    return f"id: {event_id}\nevent: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.route('/api/recipes/<int:recipe_id>/reviews/stream')
+def api_review_stream(recipe_id):
+    # Server-Sent Events з новими відгуками рецепта. EventSource після розриву сам
+    # перепідключається з Last-Event-ID, тож пропущені відгуки дочитуються з бази.
+    # Сповіщення хаба приходять лише з цього процесу; відгуки, додані через інші
+    # воркери, стрім знаходить під час періодичної перевірки (раз на heartbeat)
+    if db.session.get(Recipe, recipe_id) is None:
+        abort(404)
+    after = request.headers.get('Last-Event-ID', type=int)
+    if after is None:
+        after = request.args.get('after', type=int)
+    if after is None:
+        after = db.session.query(db.func.max(Review.id)).filter(Review.recipe_id == recipe_id).scalar() or 0
+    # З'єднання з пулу не тримаємо весь час стріму - лише на час запитів
+    db.session.close()
+
+    try:
+        subscription = review_hub.subscribe(recipe_id)
+    except HubFull:
+        return jsonify({'error': 'too many review streams'}), 503, {'Retry-After': '30'}
+
+    heartbeat = app.config['REVIEW_STREAM_HEARTBEAT']
+    batch_size = app.config['REVIEWS_MAX_PAGE_SIZE']
+    deadline = time.monotonic() + app.config['REVIEW_STREAM_MAX_SECONDS']
+
+    def stream():
+        last_id = after
+        try:
+            yield f"retry: {heartbeat * 1000}\n\n"
+            while not subscription.closed and time.monotonic() < deadline:
+                reviews = Review.query.options(joinedload(Review.author)).filter(
+                    Review.recipe_id == recipe_id, Review.id > last_id
+                ).order_by(Review.id).limit(batch_size).all()
+                events = [_sse_event(review.id, 'review', review_to_dict(review)) for review in reviews]
+                db.session.close()
+                if reviews:
+                    last_id = reviews[-1].id
+                    yield ''.join(events)
+                    if len(reviews) == batch_size:
+                        continue
+                if not subscription.wait(heartbeat):
+                    yield ': keepalive\n\n'
+        finally:
+            subscription.close()
+            db.session.close()
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype='text/event-stream',
+        # X-Accel-Buffering: nginx не повинен буферизувати стрім
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/recipes/popular')
+@conditional_get(content_validators)
+def api_popular_recipes():
+    # Найобговорюваніші рецепти: прохід по індексу review_count, без підрахунку відгуків
+    lang = request.args.get('lang') or get_lang()
+    if lang not in LANGUAGES:
+        return jsonify({'error': 'unknown lang'}), 400
+    limit = min(request.args.get('limit', app.config['POPULAR_MAX_RESULTS'], type=int), app.config['POPULAR_MAX_RESULTS'])
+
+    recipes = Recipe.query.options(
+        load_only(Recipe.id, Recipe.category, Recipe.title_uk, Recipe.title_en, Recipe.review_count, Recipe.photo_count)
+    ).order_by(Recipe.review_count.desc(), Recipe.id.desc()).limit(max(limit, 1))
+    return jsonify({
+        'results': [
+            {
+                'id': recipe.id,
+                'title': localized(recipe, 'title', lang, app.config['DEFAULT_LANGUAGE']),
+                'category': recipe.category,
+                'review_count': recipe.review_count,
+                'photo_count': recipe.photo_count
+            }
+            for recipe in recipes
+        ]
+    })
+
+@app.route('/search')
+@conditional_get(content_validators)
+def search():
+    lang = get_lang()
+    query = request.args.get('q', '').strip()
+    limit = min(request.args.get('limit', app.config['SEARCH_MAX_RESULTS'], type=int), app.config['SEARCH_MAX_RESULTS'])
+
+    hits = search_recipes(db.session, query, limit=max(limit, 1)) if query else []
+    recipes = {
+        recipe.id: recipe
+        for recipe in Recipe.query.options(
+            load_only(Recipe.id, Recipe.category, Recipe.title_uk, Recipe.title_en)
+        ).filter(Recipe.id.in_([recipe_id for recipe_id, _ in hits]))
+    }
+    return jsonify({
+        'query': query,
+        'results': [
+            {
+                'id': recipe_id,
+                'title': localized(recipes[recipe_id], 'title', lang, app.config['DEFAULT_LANGUAGE']),
+                'category': recipes[recipe_id].category,
+                'matched_in': matched_in
+            }
+            for recipe_id, matched_in in hits if recipe_id in recipes
+        ]
+    })
+
+@app.route('/api/pantry')
+@conditional_get(content_validators)
+def api_pantry():
+    # ?have=картопля,цибуля,яйце (або кілька параметрів have) -> рецепти за покриттям інгредієнтів
+    lang = request.args.get('lang') or get_lang()
+    if lang not in LANGUAGES:
+        return jsonify({'error': 'unknown lang'}), 400
+    pantry = [item.strip() for value in request.args.getlist('have') for item in value.split(',') if item.strip()]
+    limit = min(request.args.get('limit', app.config['PANTRY_MAX_RESULTS'], type=int), app.config['PANTRY_MAX_RESULTS'])
+
+    ranked = get_pantry_index().rank(pantry, content_lang(lang), limit=max(limit, 1))
+    titles = dict(
+        Recipe.query.with_entities(Recipe.id, getattr(Recipe, f'title_{lang}', getattr(Recipe, 'title_' + app.config['DEFAULT_LANGUAGE'])))
+        .filter(Recipe.id.in_([result['recipe_id'] for result in ranked]))
     )
+    for result in ranked:
+        result['title'] = titles.get(result['recipe_id'])
+    return jsonify({'have': pantry, 'results': ranked})
 
 @app.route('/set_lang/<lang_code>')
 def set_lang(lang_code):
-    if lang_code in ['uk', 'en']:
+    if lang_code in LANGUAGES:
         session['lang'] = lang_code
     return redirect(url_for('index'))
 
 @app.route('/register', methods=['POST'])
 def register():
-    lang = session.get('lang', 'uk')
-    t = TRANSLATIONS_EN if lang == 'en' else TRANSLATIONS_UK
+    t = catalogs[get_lang()]
 
     email = request.form.get('email')
     password = request.form.get('password')
@@ -251,12 +878,24 @@ def register():
         flash(t.get('flash_password_mismatch'), 'danger') 
         return redirect(url_for('index', error_tab='register')) # Перенаправляємо з параметром
     
+    ip_key = f'ip:{request.remote_addr}'
+    if ip_throttle.is_blocked(ip_key):
+        flash(t.get('flash_too_many_attempts'), 'danger')
+        return redirect(url_for('index', error_tab='register'))
+
     existing_user = User.query.filter_by(email=email).first()
     if existing_user:
         flash(t.get('flash_email_exists'), 'danger')
         return redirect(url_for('index', error_tab='register')) # Перенаправляємо з параметром
-        
-    hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
+
+    # Кожна реєстрація коштує одного bcrypt-хешу, тому теж рахується для IP
+    ip_throttle.hit(ip_key)
+    try:
+        with metrics.timer('recipes_bcrypt_seconds', op='hash'):
+            hashed_password = password_pool.hash(password)
+    except PasswordPoolBusy:
+        flash(t.get('flash_server_busy'), 'danger')
+        return redirect(url_for('index', error_tab='register'))
     user = User(email=email, password_hash=hashed_password)
     db.session.add(user)
     db.session.commit()
@@ -265,17 +904,36 @@ def register():
 
 @app.route('/login', methods=['POST'])
 def login():
-    lang = session.get('lang', 'uk')
-    t = TRANSLATIONS_EN if lang == 'en' else TRANSLATIONS_UK
+    t = catalogs[get_lang()]
 
     email = request.form.get('email')
     password = request.form.get('password')
+
+    # Перевіряємо ліміти до будь-якої роботи з bcrypt
+    email_key = f'email:{(email or "").strip().lower()}'
+    ip_key = f'ip:{request.remote_addr}'
+    if email_throttle.is_blocked(email_key) or ip_throttle.is_blocked(ip_key):
+        flash(t.get('flash_too_many_attempts'), 'danger')
+        return redirect(url_for('index', error_tab='login'))
+
     user = User.query.filter_by(email=email).first()
-    
-    if user and bcrypt.check_password_hash(user.password_hash, password):
+
+    password_ok = False
+    try:
+        if user is not None:
+            with metrics.timer('recipes_bcrypt_seconds', op='check'):
+                password_ok = password_pool.check(user.password_hash, password or '')
+    except PasswordPoolBusy:
+        flash(t.get('flash_server_busy'), 'danger')
+        return redirect(url_for('index', error_tab='login'))
+
+    if password_ok:
+        email_throttle.reset(email_key)
         login_user(user)
         return redirect(url_for('index'))
     else:
+        email_throttle.hit(email_key)
+        ip_throttle.hit(ip_key)
         flash(t.get('flash_login_fail'), 'danger')
         return redirect(url_for('index', error_tab='login')) # Перенаправляємо з параметром
 
@@ -283,409 +941,316 @@ def login():
 @login_required
 def logout():
     logout_user()
+    session.pop('_profile', None)
     return redirect(url_for('index'))
 
 @app.route('/update_profile', methods=['POST'])
 @login_required
 def update_profile():
-    current_user.first_name = request.form.get('first_name')
-    current_user.last_name = request.form.get('last_name')
+    # current_user - лише знімок, тож змінюємо саму модель; кеш і сесію
+    # оновить _apply_user_changes після commit, а сторінки з ім'ям (меню, підписи
+    # відгуків) - тригер версії вмісту на user
+    user = db.session.get(User, current_user.id)
+    user.first_name = request.form.get('first_name')
+    user.last_name = request.form.get('last_name')
     db.session.commit()
     return redirect(url_for('index'))
 
 @app.route('/add_review/<int:recipe_id>', methods=['POST'])
 @login_required 
 def add_review(recipe_id):
+    t = catalogs[get_lang()]
+    # Відгук з офлайн-черги service worker'а: замість редиректу на оболонку
+    # (з flash-повідомленням, яке він не побачить) - явний статус
+    replay = request.headers.get('X-Review-Replay') == '1'
     review_text = request.form['review_text']
+    # Відгук, написаний іншим користувачем до виходу з цього браузера
+    author_id = request.form.get('author_id')
+    if author_id and author_id != str(current_user.id):
+        abort(409)
+    # Перевірки - до збереження фото і до черги: запис з черги вже не може відповісти помилкою
+    if not review_text.strip():
+        abort(400)
+    # Лише первинний ключ: рядок рецепта з JSON-полями тут не потрібен
+    if db.session.query(Recipe.id).filter_by(id=recipe_id).first() is None:
+        abort(404)
+
     uploaded_photo_path = None
     if 'review_photo' in request.files:
         file = request.files['review_photo']
         if file and file.filename != '' and allowed_file(file.filename):
-            filename = secure_filename(file.filename)
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(file_path)
+            extension = file.filename.rsplit('.', 1)[1].lower()
+            filename, is_new = save_upload(file, app.config['UPLOAD_FOLDER'], extension)
             uploaded_photo_path = f'uploads/{filename}'
-    new_review = Review(
-        text=review_text, 
-        photo=uploaded_photo_path, 
-        recipe_id=recipe_id,
-        user_id=current_user.id 
-    )
-    db.session.add(new_review)
-    db.session.commit()
+            if is_new:
+                # Зменшені копії та WebP готуються у фоні; коли вони готові,
+                # скидаємо кеш панелі (і її ETag), щоб вона почала віддавати srcset
+                image_pipeline.submit(
+                    os.path.join(app.config['UPLOAD_FOLDER'], filename),
+                    on_done=lambda: photo_variants_ready(recipe_id)
+                )
+    review = {
+        'text': review_text,
+        'photo': uploaded_photo_path,
+        'recipe_id': recipe_id,
+        'user_id': current_user.id
+    }
+    if app.config['REVIEW_WRITE_MODE'] == 'queue':
+        try:
+            saved = review_queue.submit(review)
+        except IngestQueueFull:
+            metrics.inc('recipes_review_queue_rejected_total')
+            if replay:
+                return '', 503, {'Retry-After': '30'}
+            flash(t.get('flash_server_busy'), 'danger')
+            return redirect(url_for('index'))
+        if app.config['REVIEW_QUEUE_DURABILITY'] == 'commit':
+            try:
+                saved.result(timeout=app.config['REVIEW_QUEUE_COMMIT_TIMEOUT'])
+            except FutureTimeoutError:
+                pass  # відгук лишається в черзі і буде збережений наступною пачкою
+    else:
+        db.session.add(Review(**review))
+        db.session.commit()
+    if replay:
+        return '', 204
     return redirect(url_for('index'))
 
-# --- 5. ІНІЦІАЛІЗАЦІЯ БД (ПОВНІ РЕЦЕПТИ З БЖУ ТА ФОТО СУПІВ) ---
+def is_json_int(value, low, high):
+    # Лише справжні цілі з JSON: true - теж int у Python, а 2.5 чи Infinity - float,
+    # і int() мовчки обрізав би перше чи впав би з OverflowError на другому
+    return isinstance(value, int) and not isinstance(value, bool) and low <= value <= high
+
+def parse_portion_items():
+    # Розбирає тіло {lang, items: [{recipe_id, portions}, ...]}.
+    # Повертає (мова даних рецептів, recipe_ids, portions, None) або (None, None, None, відповідь-помилка)
+    def error(message, status=400, **extra):
+        return None, None, None, (jsonify({'error': message, **extra}), status)
+
+    data = request.get_json(silent=True)
+    if data is None:
+        data = {}
+    if not isinstance(data, dict):
+        # Масив чи число в тілі - теж коректний JSON, але не той, що очікуємо
+        return error('body must be a JSON object')
+    lang = data.get('lang') or get_lang()
+    items = data.get('items')
+
+    if lang not in LANGUAGES:
+        return error('unknown lang')
+    if not isinstance(items, list) or not items:
+        return error('items must be a non-empty list')
+    if len(items) > app.config['CALCULATE_MAX_ITEMS']:
+        return error(f"at most {app.config['CALCULATE_MAX_ITEMS']} items per request")
+
+    max_portions = app.config['CALCULATE_MAX_PORTIONS']
+    # Межа recipe_id - ціле SQLite
+    if not all(isinstance(item, dict) and is_json_int(item.get('recipe_id'), 1, 2 ** 63 - 1) for item in items):
+        return error('each item needs a positive integer recipe_id')
+    if not all(is_json_int(item.get('portions'), 1, max_portions) for item in items):
+        return error(f'portions must be integers from 1 to {max_portions}')
+    recipe_ids = [item['recipe_id'] for item in items]
+    portions = [item['portions'] for item in items]
+
+    unknown = get_nutrition_engine().unknown_ids(recipe_ids)
+    if unknown:
+        return error('unknown recipe_id', 404, recipe_ids=unknown)
+
+    return content_lang(lang), recipe_ids, portions, None
+
+@app.route('/api/calculate', methods=['POST'])
+def api_calculate():
+    lang, recipe_ids, portions, error = parse_portion_items()
+    if error:
+        return error
+    return jsonify(get_nutrition_engine().calculate(recipe_ids, portions, lang))
+
+@app.route('/api/meal-plan', methods=['POST'])
+def api_meal_plan():
+    # План харчування (напр. рецепти на тиждень з порціями) -> зведений список покупок
+    lang, recipe_ids, portions, error = parse_portion_items()
+    if error:
+        return error
+    return jsonify(get_nutrition_engine().shopping_list(recipe_ids, portions, lang))
+
+@app.route('/assets/<path:filename>')
+def asset(filename):
+    path = safe_join(app.config['ASSETS_FOLDER'], filename)
+    if path is None or not os.path.isfile(path) or filename == 'manifest.json':
+        abort(404)
+
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    path, encoding = pick_encoding(path, request.accept_encodings)
+    response = send_file(
+        path,
+        mimetype=mimetype,
+        etag=f"{os.path.basename(filename)}-{encoding or 'identity'}",
+        conditional=True,
+        max_age=app.config['ASSETS_MAX_AGE']
+    )
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+def bundle_response(bundle):
+    # Відповідь з пакетом (RecipeBundle): стиснена, якщо клієнт приймає gzip
+    encoding = 'gzip' if 'gzip' in request.accept_encodings else None
+    response = make_response(bundle.gzipped if encoding else bundle.data)
+    response.mimetype = 'application/json'
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.set_etag(f"{bundle.version}-{encoding or 'identity'}")
+    # Адреса з актуальною версією незмінна (як /assets/), без неї - перевіряти щоразу
+    if request.args.get('v') == bundle.version:
+        response.cache_control.public = True
+        response.cache_control.max_age = app.config['ASSETS_MAX_AGE']
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+@app.route('/offline/recipes.<lang>.json')
+def recipe_bundle(lang):
+    if not app.config['OFFLINE_ENABLED'] or lang not in LANGUAGES:
+        abort(404)
+    return bundle_response(get_recipe_bundle(lang))
+
+@app.route('/api/recipes/menu.<lang>.json')
+def recipe_menu(lang):
+    if lang not in LANGUAGES:
+        abort(404)
+    return bundle_response(get_recipe_menu(lang))
+
+@app.route('/service-worker.js')
+def service_worker():
+    # Лежить у корені сайту, бо service worker керує лише адресами під своїм шляхом
+    if not app.config['OFFLINE_ENABLED']:
+        abort(404)
+    precache = [static_url('style.css'), static_url('images/potato_buddy.png')]
+    precache += [recipe_bundle_url(lang) for lang in LANGUAGES]
+    script = render_template(
+        'service-worker.js', version=cache_version(precache), shell_url=url_for('index'), precache=precache
+    )
+    response = make_response(script)
+    response.mimetype = 'text/javascript'
+    response.cache_control.no_cache = True
+    return response
+
+@app.cli.command('build-assets')
+def build_assets_command():
+    manifest = build_static_assets()
+    print(f"Зібрано {len(manifest)} статичних файлів у {app.config['ASSETS_FOLDER']}")
+
+@app.cli.command('migrate')
+def migrate_command():
+    with app.app_context():
+        db.create_all()
+        applied = run_migrations(db.engine)
+        ensure_indexes()
+    print(f"Застосовано міграцій: {len(applied)}")
+
+# Службова статистика відкрита лише разом з /metrics (METRICS_ENABLED)
+@app.route('/api/cache/stats')
+def cache_stats():
+    if not metrics.enabled:
+        abort(404)
+    return jsonify(page_cache.stats())
+
+@app.route('/api/streams/stats')
+def stream_stats():
+    if not metrics.enabled:
+        abort(404)
+    return jsonify(review_hub.stats())
+
+@app.route('/metrics')
+def metrics_endpoint():
+    if not metrics.enabled:
+        abort(404)
+    return metrics.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+# Похідні від рецепта дані, що їх імпорт перебудовує пачками замість тригерів
+CATALOG_REINDEX = (reindex_recipes, sync_recipe_ingredients, bump_catalog_version)
+
+recipes_cli = AppGroup('recipes', help='Імпорт та експорт каталогу рецептів (JSON Lines).')
+app.cli.add_command(recipes_cli)
+
+@recipes_cli.command('import')
+@click.argument('source', type=click.File('r', encoding='utf-8'))
+@click.option('--batch-size', type=int, default=None)
+def import_recipes_command(source, batch_size):
+    with app.app_context():
+        try:
+            stats = import_recipes(db.engine, Recipe.__table__, source,
+                                   batch_size or app.config['CATALOG_BATCH_SIZE'], CATALOG_REINDEX)
+        except CatalogError as error:
+            raise click.ClickException(str(error))
+        build_similar()
+    print(f"Імпортовано рецептів: {stats['rows']} ({stats['batches']} пачок)")
+
+@recipes_cli.command('rebuild-counters')
+def rebuild_counters_command():
+    # Лагодить review_count / photo_count, якщо вони розійшлися з таблицею review
+    with app.app_context():
+        with db.engine.begin() as connection:
+            repaired = rebuild_review_counters(connection)
+            if repaired:
+                bump_recipe_versions(connection)
+    print(f"Виправлено лічильники рецептів: {repaired}")
+
+@recipes_cli.command('rebuild-similar')
+def rebuild_similar_command():
+    with app.app_context():
+        started = time.perf_counter()
+        count = build_similar()
+        # Панелі з блоком схожих рецептів мають перерендеритися в усіх воркерах
+        with db.engine.begin() as connection:
+            bump_recipe_versions(connection)
+    print(f"Схожі рецепти перераховано для {count} рецептів ({time.perf_counter() - started:.1f} с)")
+
+@recipes_cli.command('export')
+@click.argument('target', type=click.File('w', encoding='utf-8'), default='-')
+@click.option('--batch-size', type=int, default=None)
+def export_recipes_command(target, batch_size):
+    with app.app_context():
+        count = export_recipes(db.engine, Recipe.__table__, target,
+                               batch_size or app.config['CATALOG_BATCH_SIZE'])
+    click.echo(f"Експортовано рецептів: {count}", err=True)
+
+# --- 5. ІНІЦІАЛІЗАЦІЯ БД (ПОЧАТКОВІ РЕЦЕПТИ - data/recipes.jsonl) ---
+def iter_seed_lines():
+    with open(app.config['SEED_FILE'], encoding='utf-8') as f:
+        yield from f
+
+def ensure_indexes():
+    # create_all() створює індекси лише разом з новими таблицями, тож для вже
+    # існуючої recipes.db доводимо їх окремо (CREATE INDEX IF NOT EXISTS).
+    # Викликається після міграцій: вони можуть додавати колонки, на яких індекси
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+
 def populate_db_if_empty():
     with app.app_context():
         db.create_all()
+        # Тригери пошуку та інгредієнтів мають існувати до вставки рецептів нижче
+        run_migrations(db.engine)
+        ensure_indexes()
         
-        if Recipe.query.count() == 0:
+        # Перевірка "чи є хоч один рецепт" не залежить від розміру каталогу, на відміну від count()
+        if db.session.query(Recipe.id).first() is None:
             print("База даних пуста, заповнюємо рецептами...")
-            
-            initial_recipes = [
-                # --- КАРТОПЛЯНІ РЕЦЕПТИ ---
-                Recipe(
-                    image="images/derevenski.jpg", base_portions=4, category='classic',
-                    title_uk="Картопля по-селянськи",
-                    description_uk="Ароматні запечені скибочки картоплі у спеціях.",
-                    ingredients_uk=[
-                        {"name": "Картопля", "amount": 1, "unit": "кг", "p": 20, "f": 1, "c": 170},
-                        {"name": "Паприка", "amount": 1, "unit": "ст.л.", "p": 0.5, "f": 0.5, "c": 3},
-                        {"name": "Часник", "amount": 3, "unit": "зуб.", "p": 1, "f": 0, "c": 5},
-                        {"name": "Олія", "amount": 3, "unit": "ст.л.", "p": 0, "f": 45, "c": 0},
-                        {"name": "Сіль, перець", "amount": 0, "unit": "за смаком", "p": 0, "f": 0, "c": 0}
-                    ],
-                    instructions_uk="1. Картоплю добре вимити (можна не чистити) і нарізати скибочками.\n2. У мисці змішати олію, вичавлений часник, паприку, сіль та перець.\n3. Додати картоплю до маринаду і добре перемішати, щоб кожна скибочка була покрита.\n4. Викласти картоплю в один шар на деко, застелене пергаментом.\n5. Запікати 30-40 хвилин при 200°C, перегорнувши один раз в середині приготування для рівномірної скоринки.",
-                    
-                    title_en="Country-Style Potatoes",
-                    description_en="Aromatic baked potato wedges with spices.",
-                    ingredients_en=[
-                        {"name": "Potatoes", "amount": 1, "unit": "kg", "p": 20, "f": 1, "c": 170},
-                        {"name": "Paprika", "amount": 1, "unit": "tbsp", "p": 0.5, "f": 0.5, "c": 3},
-                        {"name": "Garlic", "amount": 3, "unit": "cloves", "p": 1, "f": 0, "c": 5},
-                        {"name": "Vegetable Oil", "amount": 3, "unit": "tbsp", "p": 0, "f": 45, "c": 0},
-                        {"name": "Salt, pepper", "amount": 0, "unit": "to taste", "p": 0, "f": 0, "c": 0}
-                    ],
-                    instructions_en="1. Wash the potatoes well (skin on is fine) and cut into wedges.\n2. In a bowl, mix oil, minced garlic, paprika, salt, and pepper.\n3. Add the potatoes to the marinade and toss well to coat each wedge.\n4. Spread the potatoes in a single layer on a baking sheet lined with parchment paper.\n5. Bake for 30-40 minutes at 200°C (400°F), flipping once halfway through for an even crust."
-                ),
-                Recipe(
-                    image="images/draniki.jpg", base_portions=4, category='classic',
-                    title_uk="Класичні деруни",
-                    description_uk="Традиційні білоруські картопляні оладки.",
-                    ingredients_uk=[
-                        {"name": "Картопля (велика)", "amount": 6, "unit": "шт.", "p": 18, "f": 1, "c": 153},
-                        {"name": "Цибуля", "amount": 1, "unit": "шт.", "p": 1, "f": 0, "c": 9},
-                        {"name": "Яйце", "amount": 1, "unit": "шт.", "p": 6, "f": 5, "c": 0.5},
-                        {"name": "Борошно", "amount": 2, "unit": "ст.л.", "p": 5, "f": 0.5, "c": 38},
-                        {"name": "Олія (для смаження)", "amount": 5, "unit": "ст.л.", "p": 0, "f": 75, "c": 0},
-                        {"name": "Сіль", "amount": 0, "unit": "за смаком", "p": 0, "f": 0, "c": 0}
-                    ],
-                    instructions_uk="1. Картоплю та цибулю почистити і натерти на дрібній тертці.\n2. Перекласти масу у дрібне сито або марлю і добре віджати зайву рідину.\n3. Перекласти суху масу в миску, додати яйце, борошно, сіль та перець. Добре перемішати.\n4. Розігріти сковороду з олією. Викладати масу столовою ложкою, формуючи оладки.\n5. Смажити на середньому вогні до золотистої скоринки з обох боків.",
-                    
-                    title_en="Classic Draniki (Potato Pancakes)",
-                    description_en="Traditional Belarusian potato pancakes.",
-                    ingredients_en=[
-                        {"name": "Potatoes (large)", "amount": 6, "unit": "pcs", "p": 18, "f": 1, "c": 153},
-                        {"name": "Onion", "amount": 1, "unit": "pc", "p": 1, "f": 0, "c": 9},
-                        {"name": "Egg", "amount": 1, "unit": "pc", "p": 6, "f": 5, "c": 0.5},
-                        {"name": "Flour", "amount": 2, "unit": "tbsp", "p": 5, "f": 0.5, "c": 38},
-                        {"name": "Oil (for frying)", "amount": 5, "unit": "tbsp", "p": 0, "f": 75, "c": 0},
-                        {"name": "Salt", "amount": 0, "unit": "to taste", "p": 0, "f": 0, "c": 0}
-                    ],
-                    instructions_en="1. Grate potatoes and onion on a fine grater.\n2. Squeeze out excess liquid.\n3. Add egg, flour, salt, and mix well.\n4. Fry on a hot pan with oil until golden brown on both sides."
-                ),
-                Recipe(
-                    image="images/puree.jpg", base_portions=4, category='classic',
-                    title_uk="Картопляне пюре",
-                    description_uk="Ніжне та повітряне пюре з молоком та маслом.",
-                    ingredients_uk=[
-                        {"name": "Картопля", "amount": 1, "unit": "кг", "p": 20, "f": 1, "c": 170},
-                        {"name": "Молоко", "amount": 200, "unit": "мл", "p": 6.6, "f": 7, "c": 10},
-                        {"name": "Вершкове масло", "amount": 50, "unit": "г", "p": 0.4, "f": 41, "c": 0},
-                        {"name": "Сіль", "amount": 0, "unit": "за смаком", "p": 0, "f": 0, "c": 0}
-                    ],
-                    instructions_uk="1. Картоплю почистити, нарізати великими шматками та відварити у підсоленій воді до готовності (близько 20 хвилин).\n2. Поки картопля вариться, підігріти молоко (не кип'ятити).\n3. Злити всю воду з картоплі.\n4. Додати вершкове масло і почати товкти.\n5. Поступово вливати тепле молоко, продовжуючи товкти до досягнення бажаної консистенції.\n6. Посолити за смаком і добре перемішати.",
-                    
-                    title_en="Mashed Potatoes",
-                    description_en="Soft and fluffy mashed potatoes with milk and butter.",
-                    ingredients_en=[
-                        {"name": "Potatoes", "amount": 1, "unit": "kg", "p": 20, "f": 1, "c": 170},
-                        {"name": "Milk", "amount": 200, "unit": "ml", "p": 6.6, "f": 7, "c": 10},
-                        {"name": "Butter", "amount": 50, "unit": "g", "p": 0.4, "f": 41, "c": 0},
-                        {"name": "Salt", "amount": 0, "unit": "to taste", "p": 0, "f": 0, "c": 0}
-                    ],
-                    instructions_en="1. Peel, chop, and boil potatoes in salted water until tender (about 20 minutes).\n2. While potatoes are boiling, heat the milk (do not boil).\n3. Drain all the water from the potatoes.\n4. Add the butter and begin to mash.\n5. Gradually pour in the warm milk, continuing to mash until you reach the desired consistency.\n6. Salt to taste and mix well."
-                ),
-                Recipe(
-                    image="images/tortilla.jpg", base_portions=6, category='world',
-                    title_uk="Іспанська Тортилья",
-                    description_uk="Знаменитий іспанський омлет з картоплею та цибулею.",
-                    ingredients_uk=[
-                        {"name": "Картопля", "amount": 500, "unit": "г", "p": 10, "f": 0.5, "c": 85},
-                        {"name": "Яйця", "amount": 6, "unit": "шт.", "p": 36, "f": 30, "c": 3},
-                        {"name": "Цибуля", "amount": 1, "unit": "шт.", "p": 1, "f": 0, "c": 9},
-                        {"name": "Оливкова олія", "amount": 150, "unit": "мл", "p": 0, "f": 150, "c": 0},
-                        {"name": "Сіль", "amount": 0, "unit": "за смаком", "p": 0, "f": 0, "c": 0}
-                    ],
-                    instructions_uk="1. Картоплю та цибулю почистити і тонко нарізати (картоплю кружальцями, цибулю півкільцями).\n2. Нагріти оливкову олію у великій сковороді. Додати картоплю та цибулю.\n3. Готувати на повільному вогні, помішуючи, 20-25 хвилин, доки картопля не стане м'якою, але не коричневою.\n4. У великій мисці збити яйця з сіллю.\n5. Вийняти картоплю та цибулю з олії шумівкою і дати стекти зайвій олії. Додати до збитих яєць.\n6. Дати суміші постояти 10-15 хвилин.\n7. На чистій сковороді розігріти трохи олії. Вилити яєчну суміш.\n8. Готувати на середньо-повільному вогні, доки краї не схопляться (близько 5-7 хвилин).\n9. Накрити сковороду великою тарілкою і впевнено перевернути тортилью на тарілку. Потім зсунути її назад у сковороду іншим боком.\n10. Готувати ще 3-5 хвилин. Подавати теплою або кімнатної температури.",
-
-                    title_en="Spanish Tortilla",
-                    description_en="A famous Spanish omelette with potatoes and onion.",
-                    ingredients_en=[
-                        {"name": "Potatoes", "amount": 500, "unit": "g", "p": 10, "f": 0.5, "c": 85},
-                        {"name": "Eggs", "amount": 6, "unit": "pcs", "p": 36, "f": 30, "c": 3},
-                        {"name": "Onion", "amount": 1, "unit": "pc", "p": 1, "f": 0, "c": 9},
-                        {"name": "Olive Oil", "amount": 150, "unit": "ml", "p": 0, "f": 150, "c": 0},
-                        {"name": "Salt", "amount": 0, "unit": "to taste", "p": 0, "f": 0, "c": 0}
-                    ],
-                    instructions_en="1. Peel and thinly slice the potatoes and onion (potatoes in rounds, onion in half-moons).\n2. Heat olive oil in a large skillet. Add potatoes and onion.\n3. Cook over low heat, stirring occasionally, for 20-25 minutes until potatoes are tender but not browned.\n4. In a large bowl, beat the eggs with salt.\n5. Remove the potatoes and onion from the oil with a slotted spoon, draining excess oil. Add them to the beaten eggs.\n6. Let the mixture sit for 10-15 minutes.\n7. Heat a little oil in a clean skillet. Pour in the egg mixture.\n8. Cook on medium-low heat until the edges are set (about 5-7 minutes).\n9. Cover the skillet with a large plate and confidently flip the tortilla onto the plate. Then, slide it back into the skillet on the other side.\n10. Cook for another 3-5 minutes. Serve warm or at room temperature."
-                ),
-                
-                # --- СУПИ ---
-                Recipe(
-                    image="images/borscht.jpg", base_portions=6, category='soup',
-                    title_uk="Борщ (Україна)", description_uk="Традиційний український суп на основі буряка.",
-                    ingredients_uk=[
-                        {"name": "Яловичина", "amount": 500, "unit": "г", "p": 105, "f": 80, "c": 0},
-                        {"name": "Буряк", "amount": 2, "unit": "шт.", "p": 3.2, "f": 0.2, "c": 20},
-                        {"name": "Картопля", "amount": 4, "unit": "шт.", "p": 8, "f": 0.4, "c": 68},
-                        {"name": "Капуста", "amount": 300, "unit": "г", "p": 3.9, "f": 0.3, "c": 17},
-                        {"name": "Морква", "amount": 1, "unit": "шт.", "p": 0.9, "f": 0.1, "c": 7},
-                        {"name": "Цибуля", "amount": 1, "unit": "шт.", "p": 1.1, "f": 0.1, "c": 9},
-                        {"name": "Томатна паста", "amount": 2, "unit": "ст.л.", "p": 2.5, "f": 0.2, "c": 10}
-                    ],
-                    instructions_uk="1. Зварити бульйон з м'яса (близько 1.5-2 годин).\n2. Дістати м'ясо, нарізати. Бульйон процідити.\n3. Нарізати картоплю кубиками, кинути в бульйон.\n4. Нашаткувати капусту, додати через 10 хвилин після картоплі.\n5. Зробити засмажку: натерти моркву та буряк, нарізати цибулю. Смажити цибулю та моркву на олії, потім додати буряк. Скропити оцтом (щоб зберіг колір).\n6. Додати томатну пасту, трохи бульйону і тушкувати 10-15 хв.\n7. Додати засмажку в суп. Варити ще 5-7 хвилин.\n8. Додати нарізане м'ясо, подрібнений часник, сіль, перець, лавровий лист.\n9. Дати настоятися 20 хвилин. Подавати зі сметаною та зеленню.",
-                    
-                    title_en="Borscht (Ukraine)", description_en="Traditional Ukrainian soup based on beetroot.",
-                    ingredients_en=[
-                        {"name": "Beef", "amount": 500, "unit": "g", "p": 105, "f": 80, "c": 0},
-                        {"name": "Beets", "amount": 2, "unit": "pcs", "p": 3.2, "f": 0.2, "c": 20},
-                        {"name": "Potatoes", "amount": 4, "unit": "pcs", "p": 8, "f": 0.4, "c": 68},
-                        {"name": "Cabbage", "amount": 300, "unit": "g", "p": 3.9, "f": 0.3, "c": 17},
-                        {"name": "Carrot", "amount": 1, "unit": "pc", "p": 0.9, "f": 0.1, "c": 7},
-                        {"name": "Onion", "amount": 1, "unit": "pc", "p": 1.1, "f": 0.1, "c": 9},
-                        {"name": "Tomato Paste", "amount": 2, "unit": "tbsp", "p": 2.5, "f": 0.2, "c": 10}
-                    ],
-                    instructions_en="1. Boil broth from the meat (about 1.5-2 hours).\n2. Remove meat, chop. Strain the broth.\n3. Dice potatoes, add to broth.\n4. Shred cabbage, add 10 minutes after potatoes.\n5. Make the 'zasmazhka': grate carrot and beets, chop onion. Sauté onion and carrot in oil, then add beets. Sprinkle with vinegar (to retain color).\n6. Add tomato paste, a little broth, and simmer for 10-15 min.\n7. Add the 'zasmazhka' to the soup. Cook for another 5-7 minutes.\n8. Add chopped meat, minced garlic, salt, pepper, bay leaf.\n9. Let it rest for 20 minutes. Serve with sour cream and herbs."
-                ),
-                Recipe(
-                    image="images/french_onion_soup.jpg", base_portions=4, category='soup',
-                    title_uk="Французький цибулевий суп", description_uk="Класичний ситний суп.",
-                    ingredients_uk=[
-                        {"name": "Цибуля", "amount": 1, "unit": "кг", "p": 11, "f": 1, "c": 90},
-                        {"name": "Вершкове масло", "amount": 50, "unit": "г", "p": 0.4, "f": 41, "c": 0},
-                        {"name": "Яловичий бульйон", "amount": 1.5, "unit": "л", "p": 15, "f": 5, "c": 5},
-                        {"name": "Сухе біле вино", "amount": 200, "unit": "мл", "p": 0.2, "f": 0, "c": 5.2},
-                        {"name": "Борошно", "amount": 1, "unit": "ст.л.", "p": 2.5, "f": 0.2, "c": 19},
-                        {"name": "Багет", "amount": 1, "unit": "шт.", "p": 27, "f": 9, "c": 150},
-                        {"name": "Сир Грюєр", "amount": 150, "unit": "г", "p": 45, "f": 49.5, "c": 0.5}
-                    ],
-                    instructions_uk="1. Нарізати цибулю тонкими півкільцями.\n2. У глибокій каструлі розтопити вершкове масло. Додати цибулю.\n3. Карамелізувати цибулю на повільному вогні, помішуючи, 30-40 хвилин до темно-коричневого кольору.\n4. Додати борошно, перемішати і смажити 1 хвилину.\n5. Влити вино, дати йому випаруватися наполовину.\n6. Влити гарячий яловичий бульйон. Додати сіль, перець. Варити 20 хвилин.\n7. Підсушити скибочки багета в духовці.\n8. Розлити суп у жароміцні горщики. Зверху покласти грінку, посипати тертим сиром.\n9. Поставити в розігріту до 200°C духовку (або під гриль) на 5-10 хвилин, доки сир не розплавиться і не стане золотистим.",
-                    
-                    title_en="French Onion Soup", description_en="A classic hearty soup.",
-                    ingredients_en=[
-                        {"name": "Onions", "amount": 1, "unit": "kg", "p": 11, "f": 1, "c": 90},
-                        {"name": "Butter", "amount": 50, "unit": "g", "p": 0.4, "f": 41, "c": 0},
-                        {"name": "Beef Broth", "amount": 1.5, "unit": "L", "p": 15, "f": 5, "c": 5},
-                        {"name": "Dry White Wine", "amount": 200, "unit": "ml", "p": 0.2, "f": 0, "c": 5.2},
-                        {"name": "Flour", "amount": 1, "unit": "tbsp", "p": 2.5, "f": 0.2, "c": 19},
-                        {"name": "Baguette", "amount": 1, "unit": "pc", "p": 27, "f": 9, "c": 150},
-                        {"name": "Gruyère Cheese", "amount": 150, "unit": "g", "p": 45, "f": 49.5, "c": 0.5}
-                    ],
-                    instructions_en="1. Thinly slice the onions into half-moons.\n2. Melt the butter in a large pot. Add onions.\n3. Caramelize the onions on low heat, stirring, for 30-40 minutes until deep brown.\n4. Add flour, stir, and cook for 1 minute.\n5. Pour in the wine, let it reduce by half.\n6. Pour in the hot beef broth. Add salt, pepper. Simmer for 20 minutes.\n7. Toast baguette slices in the oven.\n8. Ladle soup into oven-safe bowls. Top with a crouton, sprinkle with grated cheese.\n9. Place in a preheated 200°C (400°F) oven (or under the broiler) for 5-10 minutes, until cheese is melted and golden."
-                ),
-                Recipe(
-                    image="images/minestrone.jpg", base_portions=6, category='soup',
-                    title_uk="Мінестроне (Італія)",
-                    description_uk="Густий італійський овочевий суп.",
-                    ingredients_uk=[
-                        {"name": "Оливкова олія", "amount": 3, "unit": "ст.л.", "p": 0, "f": 45, "c": 0},
-                        {"name": "Цибуля", "amount": 1, "unit": "шт.", "p": 1.1, "f": 0.1, "c": 9},
-                        {"name": "Морква", "amount": 2, "unit": "шт.", "p": 1.8, "f": 0.2, "c": 14},
-                        {"name": "Селера", "amount": 2, "unit": "стебла", "p": 0.7, "f": 0.1, "c": 3},
-                        {"name": "Цукіні", "amount": 1, "unit": "шт.", "p": 2.4, "f": 0.6, "c": 6.2},
-                        {"name": "Помідори (конс.)", "amount": 400, "unit": "г", "p": 3.6, "f": 0.8, "c": 15.6},
-                        {"name": "Бульйон", "amount": 1.5, "unit": "л", "p": 1, "f": 1, "c": 1},
-                        {"name": "Квасоля (конс.)", "amount": 400, "unit": "г", "p": 24, "f": 2, "c": 88},
-                        {"name": "Паста", "amount": 100, "unit": "г", "p": 13, "f": 1.5, "c": 75}
-                    ],
-                    instructions_uk="1. Нарізати цибулю, моркву та селеру.\n2. У великій каструлі розігріти олію. Смажити овочі 10 хвилин.\n3. Додати часник, смажити 1 хв.\n4. Додати нарізаний цукіні, помідори та бульйон. Довести до кипіння.\n5. Зменшити вогонь, варити 15 хвилин.\n6. Додати квасолю та пасту.\n7. Варити ще 10-12 хвилин.\n8. Подавати з пармезаном.",
-                    
-                    title_en="Minestrone (Italy)",
-                    description_en="A thick Italian vegetable soup.",
-                    ingredients_en=[
-                        {"name": "Olive Oil", "amount": 3, "unit": "tbsp", "p": 0, "f": 45, "c": 0},
-                        {"name": "Onion", "amount": 1, "unit": "pc", "p": 1.1, "f": 0.1, "c": 9},
-                        {"name": "Carrots", "amount": 2, "unit": "pcs", "p": 1.8, "f": 0.2, "c": 14},
-                        {"name": "Celery", "amount": 2, "unit": "stalks", "p": 0.7, "f": 0.1, "c": 3},
-                        {"name": "Zucchini", "amount": 1, "unit": "pc", "p": 2.4, "f": 0.6, "c": 6.2},
-                        {"name": "Canned Tomatoes", "amount": 400, "unit": "g", "p": 3.6, "f": 0.8, "c": 15.6},
-                        {"name": "Broth", "amount": 1.5, "unit": "L", "p": 1, "f": 1, "c": 1},
-                        {"name": "Canned Beans", "amount": 400, "unit": "g", "p": 24, "f": 2, "c": 88},
-                        {"name": "Small Pasta", "amount": 100, "unit": "g", "p": 13, "f": 1.5, "c": 75}
-                    ],
-                    instructions_en="1. Chop onion, carrots, and celery.\n2. Heat oil in a large pot. Sauté vegetables for 10 minutes.\n3. Add garlic, cook 1 min.\n4. Add chopped zucchini, tomatoes, and broth. Bring to a boil.\n5. Reduce heat, simmer 15 minutes.\n6. Add beans and pasta.\n7. Cook for 10-12 more minutes.\n8. Serve with Parmesan."
-                ),
-                Recipe(
-                    image="images/ramen.jpg", base_portions=2, category='soup',
-                    title_uk="Рамен (Японія)",
-                    description_uk="Популярний японський суп з локшиною.",
-                    ingredients_uk=[
-                        {"name": "Курячий бульйон", "amount": 1, "unit": "л", "p": 10, "f": 5, "c": 5},
-                        {"name": "Соєвий соус", "amount": 3, "unit": "ст.л.", "p": 5.4, "f": 0, "c": 4.8},
-                        {"name": "Місо-паста", "amount": 1, "unit": "ст.л.", "p": 2, "f": 1, "c": 4.8},
-                        {"name": "Локшина Рамен", "amount": 200, "unit": "г", "p": 26, "f": 3, "c": 150},
-                        {"name": "Свинина (чашу)", "amount": 200, "unit": "г", "p": 54, "f": 28, "c": 0},
-                        {"name": "Яйця (варені)", "amount": 2, "unit": "шт.", "p": 12, "f": 10, "c": 1}
-                    ],
-                    instructions_uk="1. У каструлі змішати бульйон, соєвий соус, місо-пасту. Довести до кипіння.\n2. Окремо відварити локшину.\n3. Яйця зварити (6-7 хвилин), почистити, розрізати.\n4. М'ясо нарізати.\n5. У миски викласти локшину.\n6. Залити гарячим бульйоном.\n7. Зверху викласти м'ясо, яйця, зелену цибулю.",
-                    
-                    title_en="Ramen (Japan)",
-                    description_en="A popular Japanese noodle soup.",
-                    ingredients_en=[
-                        {"name": "Chicken Broth", "amount": 1, "unit": "L", "p": 10, "f": 5, "c": 5},
-                        {"name": "Soy Sauce", "amount": 3, "unit": "tbsp", "p": 5.4, "f": 0, "c": 4.8},
-                        {"name": "Miso Paste", "amount": 1, "unit": "tbsp", "p": 2, "f": 1, "c": 4.8},
-                        {"name": "Ramen Noodles", "amount": 200, "unit": "g", "p": 26, "f": 3, "c": 150},
-                        {"name": "Pork (Chashu)", "amount": 200, "unit": "g", "p": 54, "f": 28, "c": 0},
-                        {"name": "Boiled Eggs", "amount": 2, "unit": "pcs", "p": 12, "f": 10, "c": 1}
-                    ],
-                    instructions_en="1. In a pot, combine broth, soy sauce, miso paste. Bring to a boil.\n2. Separately, cook noodles.\n3. Boil eggs (6-7 minutes), peel, and cut.\n4. Slice the meat.\n5. Divide noodles into bowls.\n6. Pour hot broth over.\n7. Top with meat, eggs, and green onions."
-                ),
-                Recipe(
-                    image="images/pho_bo.jpg", base_portions=2, category='soup',
-                    title_uk="Фо Бо (В'єтнам)",
-                    description_uk="В'єтнамський яловичий суп з локшиною.",
-                    ingredients_uk=[
-                        {"name": "Яловичі кістки", "amount": 1, "unit": "кг", "p": 200, "f": 150, "c": 0},
-                        {"name": "Яловича вирізка", "amount": 300, "unit": "г", "p": 63, "f": 48, "c": 0},
-                        {"name": "Цибуля", "amount": 2, "unit": "шт.", "p": 2.2, "f": 0.2, "c": 18},
-                        {"name": "Імбир (корінь)", "amount": 5, "unit": "см", "p": 0.5, "f": 0.2, "c": 4},
-                        {"name": "Рисова локшина", "amount": 200, "unit": "г", "p": 14, "f": 1, "c": 84}
-                    ],
-                    instructions_uk="1. Обсмалити цибулю та імбир. Очистити.\n2. Кістки залити водою, довести до кипіння, злити. Промити.\n3. Залити кістки чистою водою (3-4 л), додати цибулю, імбир, спеції. Варити 3-6 годин.\n4. Процідити бульйон.\n5. Вирізку нарізати тонкими скибочками.\n6. Рисову локшину замочити.\n7. У миску викласти локшину, сиру яловичину.\n8. Залити киплячим бульйоном.\n9. Подавати з лаймом, м'ятою, кінзою.",
-                    
-                    title_en="Pho Bo (Vietnam)",
-                    description_en="A Vietnamese beef noodle soup.",
-                    ingredients_en=[
-                        {"name": "Beef Bones", "amount": 1, "unit": "kg", "p": 200, "f": 150, "c": 0},
-                        {"name": "Beef Sirloin", "amount": 300, "unit": "g", "p": 63, "f": 48, "c": 0},
-                        {"name": "Onions", "amount": 2, "unit": "pcs", "p": 2.2, "f": 0.2, "c": 18},
-                        {"name": "Ginger (root)", "amount": 5, "unit": "cm", "p": 0.5, "f": 0.2, "c": 4},
-                        {"name": "Rice Noodles", "amount": 200, "unit": "g", "p": 14, "f": 1, "c": 84}
-                    ],
-                    instructions_en="1. Char onions and ginger. Peel.\n2. Cover bones with water, boil, discard water. Rinse.\n3. Cover bones with clean water (3-4 L), add onion, ginger, spices. Simmer 3-6 hours.\n4. Strain broth.\n5. Slice sirloin paper-thin.\n6. Soak rice noodles.\n7. Place noodles and raw beef in a bowl.\n8. Pour boiling hot broth over.\n9. Serve with lime, mint, cilantro."
-                ),
-                Recipe(
-                    image="images/tom_yum.jpg", base_portions=4, category='soup',
-                    title_uk="Том Ям (Таїланд)",
-                    description_uk="Гострий і кислий тайський суп з креветками.",
-                    ingredients_uk=[
-                        {"name": "Креветки", "amount": 400, "unit": "г", "p": 96, "f": 4, "c": 0},
-                        {"name": "Курячий бульйон", "amount": 1, "unit": "л", "p": 10, "f": 5, "c": 5},
-                        {"name": "Паста Том Ям", "amount": 2, "unit": "ст.л.", "p": 2, "f": 10, "c": 10},
-                        {"name": "Кокосове молоко", "amount": 200, "unit": "мл", "p": 4, "f": 40, "c": 6},
-                        {"name": "Гриби", "amount": 200, "unit": "г", "p": 6, "f": 0.6, "c": 6.4}
-                    ],
-                    instructions_uk="1. У каструлі довести бульйон до кипіння.\n2. Додати пасту Том Ям.\n3. Додати нарізані гриби. Варити 5 хвилин.\n4. Додати очищені креветки. Варити 2-3 хвилини.\n5. Додати помідори чері.\n6. Влити кокосове молоко та рибний соус. Прогріти, не кип'ятити.\n7. Зняти з вогню, додати сік лайма.",
-                    
-                    title_en="Tom Yum (Thailand)",
-                    description_en="A hot and sour Thai soup with shrimp.",
-                    ingredients_en=[
-                        {"name": "Shrimp", "amount": 400, "unit": "g", "p": 96, "f": 4, "c": 0},
-                        {"name": "Chicken Broth", "amount": 1, "unit": "L", "p": 10, "f": 5, "c": 5},
-                        {"name": "Tom Yum Paste", "amount": 2, "unit": "tbsp", "p": 2, "f": 10, "c": 10},
-                        {"name": "Coconut Milk", "amount": 200, "unit": "ml", "p": 4, "f": 40, "c": 6},
-                        {"name": "Mushrooms", "amount": 200, "unit": "g", "p": 6, "f": 0.6, "c": 6.4}
-                    ],
-                    instructions_en="1. In a pot, bring the broth to a boil.\n2. Add Tom Yum paste.\n3. Add sliced mushrooms. Cook 5 minutes.\n4. Add peeled shrimp. Cook 2-3 minutes.\n5. Add cherry tomatoes.\n6. Pour in coconut milk and fish sauce. Heat, do not boil.\n7. Remove from heat, add lime juice."
-                ),
-                Recipe(
-                    image="images/gazpacho.jpg", base_portions=4, category='soup',
-                    title_uk="Гаспачо (Іспанія)",
-                    description_uk="Холодний іспанський овочевий суп.",
-                    ingredients_uk=[
-                        {"name": "Помідори", "amount": 1, "unit": "кг", "p": 9, "f": 2, "c": 39},
-                        {"name": "Огірок", "amount": 1, "unit": "шт.", "p": 1, "f": 0.2, "c": 5.4},
-                        {"name": "Болгарський перець", "amount": 1, "unit": "шт.", "p": 1.3, "f": 0.3, "c": 6},
-                        {"name": "Оливкова олія", "amount": 100, "unit": "мл", "p": 0, "f": 100, "c": 0},
-                        {"name": "Черствий хліб", "amount": 50, "unit": "г", "p": 4.5, "f": 1.5, "c": 25}
-                    ],
-                    instructions_uk="1. Овочі грубо нарізати.\n2. Хліб замочити у воді, віджати.\n3. Скласти овочі та хліб у блендер.\n4. Додати оливкову олію, оцет, сіль.\n5. Збити до однорідної маси.\n6. Охолодити в холодильнику щонайменше 2 години.",
-                    
-                    title_en="Gazpacho (Spain)",
-                    description_en="A cold Spanish vegetable soup.",
-                    ingredients_en=[
-                        {"name": "Ripe Tomatoes", "amount": 1, "unit": "kg", "p": 9, "f": 2, "c": 39},
-                        {"name": "Cucumber", "amount": 1, "unit": "pc", "p": 1, "f": 0.2, "c": 5.4},
-                        {"name": "Bell Pepper", "amount": 1, "unit": "pc", "p": 1.3, "f": 0.3, "c": 6},
-                        {"name": "Olive Oil", "amount": 100, "unit": "ml", "p": 0, "f": 100, "c": 0},
-                        {"name": "Stale Bread", "amount": 50, "unit": "g", "p": 4.5, "f": 1.5, "c": 25}
-                    ],
-                    instructions_en="1. Roughly chop vegetables.\n2. Soak bread in water, squeeze.\n3. Place vegetables and bread in a blender.\n4. Add olive oil, vinegar, salt.\n5. Blend until smooth.\n6. Chill in the refrigerator for at least 2 hours."
-                ),
-                Recipe(
-                    image="images/chicken_noodle_soup.jpg", base_portions=4, category='soup',
-                    title_uk="Курячий суп з локшиною",
-                    description_uk="Заспокійливий класичний суп.",
-                    ingredients_uk=[
-                        {"name": "Курка", "amount": 1, "unit": "кг", "p": 270, "f": 140, "c": 0},
-                        {"name": "Морква", "amount": 2, "unit": "шт.", "p": 1.8, "f": 0.2, "c": 14},
-                        {"name": "Селера", "amount": 2, "unit": "стебла", "p": 0.7, "f": 0.1, "c": 3},
-                        {"name": "Цибуля", "amount": 1, "unit": "шт.", "p": 1.1, "f": 0.1, "c": 9},
-                        {"name": "Яєчна локшина", "amount": 200, "unit": "г", "p": 28, "f": 4, "c": 140}
-                    ],
-                    instructions_uk="1. Покласти курку у каструлю, залити водою. Довести до кипіння, зняти піну.\n2. Додати цибулю, моркву, селеру. Варити 1.5 години.\n3. Вийняти курку та овочі. Бульйон процідити.\n4. Відокремити м'ясо курки від кісток, нарізати.\n5. Повернути бульйон на вогонь. Додати м'ясо.\n6. Всипати локшину і варити до готовності (5-7 хвилин).\n7. Додати сіль, перець, зелень.",
-                    
-                    title_en="Chicken Noodle Soup",
-                    description_en="A comforting classic soup.",
-                    ingredients_en=[
-                        {"name": "Chicken", "amount": 1, "unit": "kg", "p": 270, "f": 140, "c": 0},
-                        {"name": "Carrots", "amount": 2, "unit": "pcs", "p": 1.8, "f": 0.2, "c": 14},
-                        {"name": "Celery", "amount": 2, "unit": "stalks", "p": 0.7, "f": 0.1, "c": 3},
-                        {"name": "Onion", "amount": 1, "unit": "pc", "p": 1.1, "f": 0.1, "c": 9},
-                        {"name": "Egg Noodles", "amount": 200, "unit": "g", "p": 28, "f": 4, "c": 140}
-                    ],
-                    instructions_en="1. Place chicken in a pot, cover with water. Bring to a boil, skim foam.\n2. Add onion, carrots, celery. Simmer 1.5 hours.\n3. Remove chicken and vegetables. Strain broth.\n4. Shred chicken meat.\n5. Return broth to pot. Add meat.\n6. Add noodles and cook until al dente (5-7 minutes).\n7. Add salt, pepper, and herbs."
-                ),
-                Recipe(
-                    image="images/miso_soup.jpg", base_portions=4, category='soup',
-                    title_uk="Місо-суп (Японія)",
-                    description_uk="Традиційний японський суп.",
-                    ingredients_uk=[
-                        {"name": "Бульйон Дасі", "amount": 800, "unit": "мл", "p": 2, "f": 0.2, "c": 1},
-                        {"name": "Місо-паста", "amount": 3, "unit": "ст.л.", "p": 6, "f": 3, "c": 14.4},
-                        {"name": "Тофу (шовковий)", "amount": 150, "unit": "г", "p": 12, "f": 7.5, "c": 4.5},
-                        {"name": "Водорості Вакаме (сухі)", "amount": 1, "unit": "ст.л.", "p": 0.5, "f": 0.1, "c": 2}
-                    ],
-                    instructions_uk="1. Замочити Вакаме у воді.\n2. Нарізати тофу кубиками.\n3. Нагріти Дасі (не кип'ятити).\n4. Розвести місо-пасту у невеликій кількості бульйону, влити у каструлю.\n5. Додати Вакаме та тофу. Прогріти 1-2 хвилини (не кип'ятити).\n6. Подавати, посипавши зеленою цибулею.",
-                    
-                    title_en="Miso Soup (Japan)",
-                    description_en="A traditional Japanese soup.",
-                    ingredients_en=[
-                        {"name": "Dashi Stock", "amount": 800, "unit": "ml", "p": 2, "f": 0.2, "c": 1},
-                        {"name": "Miso Paste", "amount": 3, "unit": "tbsp", "p": 6, "f": 3, "c": 14.4},
-                        {"name": "Silken Tofu", "amount": 150, "unit": "g", "p": 12, "f": 7.5, "c": 4.5},
-                        {"name": "Dried Wakame", "amount": 1, "unit": "tbsp", "p": 0.5, "f": 0.1, "c": 2}
-                    ],
-                    instructions_en="1. Soak Wakame in water.\n2. Cube the tofu.\n3. Heat Dashi (do not boil).\n4. Dissolve miso paste in a little broth, add to pot.\n5. Add Wakame and tofu. Heat for 1-2 minutes (do not boil).\n6. Serve, garnished with green onion."
-                ),
-                Recipe(
-                    image="images/clam_chowder.jpg", base_portions=4, category='soup',
-                    title_uk="Клем-чаудер (США)",
-                    description_uk="Густий кремовий суп з молюсків.",
-                    ingredients_uk=[
-                        {"name": "Бекон", "amount": 100, "unit": "г", "p": 14, "f": 42, "c": 1.5},
-                        {"name": "Цибуля", "amount": 1, "unit": "шт.", "p": 1.1, "f": 0.1, "c": 9},
-                        {"name": "Картопля", "amount": 2, "unit": "шт.", "p": 4, "f": 0.2, "c": 34},
-                        {"name": "Борошно", "amount": 2, "unit": "ст.л.", "p": 5, "f": 0.5, "c": 38},
-                        {"name": "Молоко", "amount": 500, "unit": "мл", "p": 16.5, "f": 17.5, "c": 25},
-                        {"name": "Вершки (20%)", "amount": 200, "unit": "мл", "p": 5, "f": 40, "c": 8},
-                        {"name": "Молюски (конс.)", "amount": 200, "unit": "г", "p": 28, "f": 2, "c": 6}
-                    ],
-                    instructions_uk="1. Нарізати бекон і обсмажити. Вийняти.\n2. Нарізати цибулю. Смажити на жирі від бекону.\n3. Додати борошно, смажити 1 хвилину.\n4. Поступово влити молоко, помішуючи.\n5. Нарізати картоплю дрібними кубиками, додати в суп. Варити 15-20 хвилин.\n6. Додати вершки та молюски. Прогріти 5 хвилин.\n7. Додати сіль, перець та бекон.",
-                    
-                    title_en="Clam Chowder (USA)",
-                    description_en="A thick, creamy soup made with clams.",
-                    ingredients_en=[
-                        {"name": "Bacon", "amount": 100, "unit": "g", "p": 14, "f": 42, "c": 1.5},
-                        {"name": "Onion", "amount": 1, "unit": "pc", "p": 1.1, "f": 0.1, "c": 9},
-                        {"name": "Potatoes", "amount": 2, "unit": "pcs", "p": 4, "f": 0.2, "c": 34},
-                        {"name": "Flour", "amount": 2, "unit": "tbsp", "p": 5, "f": 0.5, "c": 38},
-                        {"name": "Milk", "amount": 500, "unit": "ml", "p": 16.5, "f": 17.5, "c": 25},
-                        {"name": "Heavy Cream (20%)", "amount": 200, "unit": "ml", "p": 5, "f": 40, "c": 8},
-                        {"name": "Canned Clams", "amount": 200, "unit": "g", "p": 28, "f": 2, "c": 6}
-                    ],
-                    instructions_en="1. Dice bacon and fry. Remove.\n2. Chop onion. Sauté in bacon fat.\n3. Add flour, cook 1 minute.\n4. Gradually whisk in milk.\n5. Dice potatoes, add to soup. Cook 15-20 minutes.\n6. Add cream and clams. Heat 5 minutes.\n7. Add salt, pepper, and bacon."
-                )
-            ]
-            
-            db.session.bulk_save_objects(initial_recipes)
-            db.session.commit()
-            print(f"Рецепти (всього {len(initial_recipes)}) додано.")
+            stats = import_recipes(db.engine, Recipe.__table__, iter_seed_lines(),
+                                   app.config['CATALOG_BATCH_SIZE'], CATALOG_REINDEX)
+            print(f"Рецепти (всього {stats['rows']}) додано.")
+            build_similar()
         else:
             print("База даних вже заповнена.")
+            if not similar_recipes.exists():
+                build_similar()
 
 if __name__ == '__main__':
     populate_db_if_empty()
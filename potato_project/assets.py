@@ -0,0 +1,80 @@
+import gzip
+import hashlib
+import json
+import os
+import posixpath
+import shutil
+
+try:
+    import brotli
+except ImportError:  # без пакета brotli готуємо лише .gz
+    brotli = None
+
+
+# Текстові файли варто стискати заздалегідь; картинки (jpg/png/webp) вже стиснуті
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.json', '.svg', '.txt', '.html', '.webmanifest'}
+HASH_LENGTH = 10
+
+
+def fingerprint_name(path, digest):
+    stem, extension = posixpath.splitext(path)
+    return f'{stem}.{digest[:HASH_LENGTH]}{extension}'
+
+
+def _write_if_missing(path, data):
+    if not os.path.exists(path):
+        temp_path = path + '.part'
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+
+def build_assets(static_folder, output_folder, skip_dirs=()):
+    # Копіює статичні файли в output_folder під іменами з хешем вмісту
+    # (style.css -> style.<hash>.css), поруч кладе .gz/.br версії і
+    # записує manifest.json: оригінальний шлях -> шлях з хешем.
+    # Файли з хешем в імені ніколи не змінюються, тож повторна збірка
+    # пропускає вже готові.
+    skip = {os.path.abspath(path) for path in (output_folder, *skip_dirs)}
+    manifest = {}
+
+    for root, dirs, files in os.walk(static_folder):
+        dirs[:] = [d for d in dirs if os.path.abspath(os.path.join(root, d)) not in skip]
+        for name in files:
+            source = os.path.join(root, name)
+            relative = os.path.relpath(source, static_folder).replace(os.sep, '/')
+            with open(source, 'rb') as f:
+                data = f.read()
+
+            hashed = fingerprint_name(relative, hashlib.sha256(data).hexdigest())
+            target = os.path.join(output_folder, *hashed.split('/'))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if not os.path.exists(target):
+                shutil.copyfile(source, target)
+
+            if posixpath.splitext(name)[1].lower() in COMPRESSIBLE_EXTENSIONS:
+                _write_if_missing(target + '.gz', gzip.compress(data, compresslevel=9, mtime=0))
+                if brotli is not None:
+                    _write_if_missing(target + '.br', brotli.compress(data, quality=11))
+
+            manifest[relative] = hashed
+
+    with open(os.path.join(output_folder, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(output_folder):
+    try:
+        with open(os.path.join(output_folder, 'manifest.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def pick_encoding(path, accept_encodings):
+    # Повертає (шлях до файлу, Content-Encoding) з урахуванням Accept-Encoding
+    for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+        if encoding in accept_encodings and os.path.exists(path + suffix):
+            return path + suffix, encoding
+    return path, None
@@ -0,0 +1,191 @@
+import hashlib
+import json
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+import bcrypt
+from flask_login import UserMixin
+
+
+class PasswordPoolBusy(Exception):
+    pass
+
+
+# --- Робота з bcrypt (виконується у процесах пулу) ---
+
+def _hash_password(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+def _check_password(password_hash, password):
+    try:
+        return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+    except ValueError:
+        return False
+
+
+class PasswordPool:
+    # bcrypt свідомо повільний (~100-300 мс CPU), тому хешування виконується в окремому
+    # пулі процесів обмеженого розміру. Якщо в черзі вже max_pending задач, нові
+    # одразу відхиляються (PasswordPoolBusy), а не блокують потоки, що віддають сторінки.
+    def __init__(self, workers=2, max_pending=16, rounds=12, timeout=10):
+        self.workers = workers
+        self.rounds = rounds
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _submit(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+
+        if not self._slots.acquire(blocking=False):
+            raise PasswordPoolBusy()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise PasswordPoolBusy()
+
+    def _get_executor(self):
+        # Пул створюється при першому використанні, а не під час імпорту модуля.
+        # forkserver, а не fork: воркер gunicorn уже має потоки (черги, стріми), і
+        # fork посеред чужого lock лишив би дочірній процес із навічно зайнятим замком.
+        # Там, де forkserver немає (Windows), - spawn
+        with self._lock:
+            if self._executor is None:
+                method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context(method)
+                )
+            return self._executor
+
+    def hash(self, password):
+        return self._submit(_hash_password, password, self.rounds)
+
+    def check(self, password_hash, password):
+        return self._submit(_check_password, password_hash, password)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+# --- Обмеження кількості спроб входу ---
+
+class AttemptThrottle:
+    # Ковзне вікно: не більше max_attempts спроб за window секунд на ключ
+    # (напр. 'email:...' чи 'ip:...'). Кількість ключів обмежена max_keys.
+    # Лічильники живуть у пам'яті процесу: кожен воркер gunicorn рахує свої, тож
+    # насправді ліміт - max_attempts, помножене на кількість воркерів
+    def __init__(self, max_attempts=5, window=300, max_keys=10000):
+        self.max_attempts = max_attempts
+        self.window = window
+        self.max_keys = max_keys
+        self._attempts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _recent(self, key, now):
+        attempts = self._attempts.get(key)
+        if attempts is None:
+            return None
+        while attempts and attempts[0] <= now - self.window:
+            attempts.popleft()
+        if not attempts:
+            del self._attempts[key]
+            return None
+        return attempts
+
+    def is_blocked(self, key):
+        with self._lock:
+            attempts = self._recent(key, time.monotonic())
+            return attempts is not None and len(attempts) >= self.max_attempts
+
+    def hit(self, key):
+        now = time.monotonic()
+        with self._lock:
+            attempts = self._recent(key, now)
+            if attempts is None:
+                attempts = self._attempts[key] = deque(maxlen=self.max_attempts)
+            attempts.append(now)
+            self._attempts.move_to_end(key)
+            while len(self._attempts) > self.max_keys:
+                self._attempts.popitem(last=False)
+
+    def reset(self, key):
+        with self._lock:
+            self._attempts.pop(key, None)
+
+
+# --- Кеш користувачів для current_user ---
+
+class UserSnapshot(UserMixin):
+    # Незмінна копія полів, потрібних сторінкам (без хешу пароля і поза сесією ORM).
+    # Щоб змінити користувача, його треба завантажити з бази як модель User
+    FIELDS = ('id', 'email', 'first_name', 'last_name')
+
+    def __init__(self, id, email, first_name=None, last_name=None):
+        self.id = id
+        self.email = email
+        self.first_name = first_name
+        self.last_name = last_name
+
+    def to_list(self):
+        return [getattr(self, field) for field in self.FIELDS]
+
+    def fingerprint(self):
+        # Короткий відбиток полів знімка для ключів кешу і ETag сторінок користувача
+        data = json.dumps(self.to_list(), ensure_ascii=False).encode('utf-8')
+        return hashlib.sha256(data).hexdigest()[:12]
+
+
+class IdentityCache:
+    # LRU з TTL: id -> знімок користувача. Зміни, зроблені в цьому процесі, скидають
+    # запис одразу (invalidate); зміни з інших воркерів стають видимі не пізніше ніж за ttl
+    def __init__(self, max_size=10000, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._users = OrderedDict()  # id -> (знімок, момент завантаження)
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is not None and now - entry[1] < self.ttl:
+                self._users.move_to_end(user_id)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._users[user_id]
+            self.misses += 1
+            return None
+
+    def set(self, user):
+        with self._lock:
+            self._users[user.id] = (user, time.monotonic())
+            self._users.move_to_end(user.id)
+            while len(self._users) > self.max_size:
+                self._users.popitem(last=False)
+
+    def invalidate(self, *user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._users.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
@@ -0,0 +1,271 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+# --- Навантажувальний бенчмарк на синтетичному каталозі ---
+# python benchmark.py --recipes 10000 --reviews 1000000 --users 100000
+# Синтетична база генерується один раз (benchmarks/data/, назва файлу залежить від
+# розмірів і seed); кожен запуск працює на свіжій копії, бо сценарій відгуків
+# дописує в базу і інакше наступні запуски міряли б інші дані. Кожен сценарій
+# проганяється через тестовий клієнт Flask у кількох потоках; результати
+# дописуються в benchmarks/results.jsonl разом з комітом, тож запуски на різних
+# комітах можна порівнювати (--compare показує різницю з попереднім запуском).
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+
+BENCHMARK_PASSWORD = 'benchmark-password'
+REVIEW_WORDS = (
+    'смачно дуже рецепт картопля борщ суп вийшло чудово додав більше солі спецій '
+    'tasty great recipe potatoes soup turned out perfect added more garlic pepper family loved'
+).split()
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=basedir, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def copy_database(source, target):
+    # Backup API копіює узгоджений знімок разом з WAL, на відміну від копіювання файлу
+    src, dst = sqlite3.connect(source), sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        src.close()
+        dst.close()
+
+
+def write_synthetic_catalog(path, count, seed_file):
+    # Варіації початкових рецептів: ті самі інгредієнти й тексти, нові id і назви
+    with open(seed_file, encoding='utf-8') as f:
+        seeds = [json.loads(line) for line in f if line.strip()]
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            recipe = dict(seeds[i % len(seeds)])
+            recipe['id'] = i + 1
+            recipe['title_uk'] = f"{recipe['title_uk']} #{i + 1}"
+            recipe['title_en'] = f"{recipe['title_en']} #{i + 1}"
+            f.write(json.dumps(recipe, ensure_ascii=False) + '\n')
+
+
+def populate_synthetic(recipes_app, args, rng):
+    db, User, Review = recipes_app.db, recipes_app.User, recipes_app.Review
+    recipes_app.populate_db_if_empty()  # міграції + синтетичний каталог як SEED_FILE
+
+    with recipes_app.app.app_context():
+        if db.session.query(User.id).first() is not None:
+            return
+        # Один хеш на всіх: генерація 100k bcrypt-хешів зайняла б години
+        password_hash = recipes_app.password_pool.hash(BENCHMARK_PASSWORD)
+        started = time.perf_counter()
+        for start in range(0, args.users, args.batch_size):
+            rows = [
+                {'id': user_id, 'email': f'user{user_id}@bench.local', 'password_hash': password_hash,
+                 'first_name': f'User{user_id}', 'last_name': None}
+                for user_id in range(start + 1, min(start + args.batch_size, args.users) + 1)
+            ]
+            with db.engine.begin() as connection:
+                connection.execute(User.__table__.insert(), rows)
+        print(f"Користувачів: {args.users} ({time.perf_counter() - started:.1f} с)")
+
+        started = time.perf_counter()
+        for start in range(0, args.reviews, args.batch_size):
+            rows = [
+                {
+                    # Логарифмічно-рівномірний розподіл: кілька популярних рецептів
+                    # мають тисячі відгуків, більшість - небагато
+                    'recipe_id': int(args.recipes ** rng.random()),
+                    'user_id': rng.randint(1, args.users),
+                    'text': ' '.join(rng.choices(REVIEW_WORDS, k=rng.randint(5, 30))),
+                    'photo': None
+                }
+                for _ in range(min(args.batch_size, args.reviews - start))
+            ]
+            with db.engine.begin() as connection:
+                connection.execute(Review.__table__.insert(), rows)
+        print(f"Відгуків: {args.reviews} ({time.perf_counter() - started:.1f} с)")
+
+
+# --- Сценарії: функція (клієнт, rng, args) -> відповідь ---
+
+def scenario_home(client, rng, args):
+    return client.get('/')
+
+def scenario_panel(client, rng, args):
+    return client.get(f'/recipe/{rng.randint(1, args.recipes)}/panel')
+
+def scenario_calculator(client, rng, args):
+    items = [{'recipe_id': rng.randint(1, args.recipes), 'portions': rng.randint(1, 8)}
+             for _ in range(rng.randint(1, 5))]
+    return client.post('/api/calculate', json={'lang': 'uk', 'items': items})
+
+def scenario_login(client, rng, args):
+    email = f'user{rng.randint(1, args.users)}@bench.local'
+    return client.post('/login', data={'email': email, 'password': BENCHMARK_PASSWORD})
+
+def scenario_review(client, rng, args):
+    return client.post(f'/add_review/{rng.randint(1, args.recipes)}',
+                       data={'review_text': ' '.join(rng.choices(REVIEW_WORDS, k=12))})
+
+# Записи йдуть останніми, щоб не скидати кеш сторінок для сценаріїв читання
+SCENARIOS = {
+    'home': (scenario_home, False),
+    'panel': (scenario_panel, False),
+    'calculator': (scenario_calculator, False),
+    'login': (scenario_login, False),
+    'review': (scenario_review, True),
+}
+
+
+def run_scenario(recipes_app, name, args):
+    action, needs_login = SCENARIOS[name]
+    local = threading.local()
+
+    def client_for_thread():
+        # Окремий клієнт (і сесія) на кожен потік навантаження
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = recipes_app.app.test_client()
+            local.rng = random.Random(f'{args.seed}-{name}-{threading.get_ident()}')
+            if needs_login:
+                client.post('/login', data={'email': 'user1@bench.local', 'password': BENCHMARK_PASSWORD})
+        return client, local.rng
+
+    def one_request(_):
+        client, rng = client_for_thread()
+        started = time.perf_counter()
+        response = action(client, rng, args)
+        elapsed = time.perf_counter() - started
+        ok = response.status_code < 400
+        response.close()
+        return elapsed, ok
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(one_request, range(args.warmup)))
+        started = time.perf_counter()
+        results = list(pool.map(one_request, range(args.requests)))
+        wall = time.perf_counter() - started
+
+    latencies = np.array([elapsed for elapsed, _ in results]) * 1000
+    return {
+        'requests': args.requests,
+        'errors': sum(1 for _, ok in results if not ok),
+        'throughput_rps': round(args.requests / wall, 1),
+        'p50_ms': round(float(np.percentile(latencies, 50)), 2),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 2),
+        'mean_ms': round(float(latencies.mean()), 2)
+    }
+
+
+def previous_run(results_file, params):
+    if not os.path.exists(results_file):
+        return None
+    previous = None
+    with open(results_file, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                run = json.loads(line)
+                if run.get('params') == params:
+                    previous = run
+    return previous
+
+
+def print_report(run, previous):
+    print(f"\nКоміт {run['commit']}, {run['params']}")
+    print(f"{'сценарій':<12}{'rps':>10}{'p50, мс':>10}{'p99, мс':>10}{'помилок':>9}")
+    for name, stats in run['scenarios'].items():
+        line = f"{name:<12}{stats['throughput_rps']:>10}{stats['p50_ms']:>10}{stats['p99_ms']:>10}{stats['errors']:>9}"
+        before = previous and previous['scenarios'].get(name)
+        if before:
+            changes = [
+                f"{key.split('_')[0]} {(stats[key] - before[key]) / before[key] * 100:+.0f}%"
+                for key in ('throughput_rps', 'p50_ms', 'p99_ms') if before[key]
+            ]
+            line += f"   vs {previous['commit']}: " + ', '.join(changes)
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Навантажувальний бенчмарк книги рецептів')
+    parser.add_argument('--recipes', type=int, default=10000)
+    parser.add_argument('--reviews', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--requests', type=int, default=500, help='запитів на сценарій')
+    parser.add_argument('--warmup', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--batch-size', type=int, default=50000)
+    parser.add_argument('--data-dir', default=os.path.join(basedir, 'benchmarks', 'data'))
+    parser.add_argument('--results', default=os.path.join(basedir, 'benchmarks', 'results.jsonl'))
+    parser.add_argument('--compare', action='store_true', help='порівняти з попереднім запуском')
+    args = parser.parse_args()
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    name = f'bench-r{args.recipes}-v{args.reviews}-u{args.users}-s{args.seed}'
+    catalog_file = os.path.join(args.data_dir, name + '.jsonl')
+    if not os.path.exists(catalog_file):
+        write_synthetic_catalog(catalog_file, args.recipes, os.path.join(basedir, 'data', 'recipes.jsonl'))
+
+    # Конфігурація застосунку - через змінні оточення RECIPES_*, тож їх треба
+    # задати до імпорту app; явно задані користувачем значення не перезаписуються
+    base_db = os.path.join(args.data_dir, name + '.db')
+    run_db = os.path.join(args.data_dir, name + '.run.db')
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(run_db + suffix):
+            os.remove(run_db + suffix)
+    if os.path.exists(base_db):
+        copy_database(base_db, run_db)
+    os.environ['RECIPES_SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + run_db
+    os.environ['RECIPES_SEED_FILE'] = json.dumps(catalog_file)
+    os.environ['RECIPES_SIMILAR_FILE'] = json.dumps(os.path.join(args.data_dir, name + '.similar.npy'))
+    os.environ.setdefault('RECIPES_SECRET_KEY', json.dumps('benchmark'))
+    os.environ.setdefault('RECIPES_LOGIN_MAX_ATTEMPTS', '1000000')
+    os.environ.setdefault('RECIPES_LOGIN_IP_MAX_ATTEMPTS', '1000000')
+    import app as recipes_app
+
+    populate_synthetic(recipes_app, args, random.Random(args.seed))
+    if not os.path.exists(base_db):
+        copy_database(run_db, base_db)
+
+    scenarios = [scenario.strip() for scenario in args.scenarios.split(',') if scenario.strip()]
+    run = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'params': {
+            'recipes': args.recipes, 'reviews': args.reviews, 'users': args.users,
+            'requests': args.requests, 'concurrency': args.concurrency, 'seed': args.seed,
+            'page_cache': recipes_app.app.config['PAGE_CACHE_ENABLED'],
+            'bcrypt_rounds': recipes_app.app.config['BCRYPT_LOG_ROUNDS']
+        },
+        'scenarios': {}
+    }
+    for scenario in scenarios:
+        print(f"Сценарій {scenario}...")
+        run['scenarios'][scenario] = run_scenario(recipes_app, scenario, args)
+
+    previous = previous_run(args.results, run['params']) if args.compare else None
+    os.makedirs(os.path.dirname(args.results), exist_ok=True)
+    with open(args.results, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(run, ensure_ascii=False) + '\n')
+    print_report(run, previous)
+    recipes_app.password_pool.shutdown()
+
+
+if __name__ == '__main__':
+    main()
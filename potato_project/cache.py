@@ -0,0 +1,82 @@
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+
+# --- Сховища кешу ---
+# PageCache працює з будь-яким сховищем з методами get/set, тож замість LRU у пам'яті
+# процесу можна підставити, наприклад, обгортку над Redis. Видаляти записи не потрібно:
+# ключі містять версії з бази, і застарілі сторінки витісняє саме сховище.
+
+class CacheBackend(ABC):
+    @abstractmethod
+    def get(self, key):
+        ...
+
+    @abstractmethod
+    def set(self, key, value):
+        ...
+
+    def __len__(self):
+        return 0
+
+
+class LRUBackend(CacheBackend):
+    def __init__(self, max_size=512):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+# --- Кеш відрендерених сторінок і фрагментів ---
+
+class PageCache:
+    def __init__(self, backend=None, enabled=True):
+        self.backend = backend if backend is not None else LRUBackend()
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get_or_render(self, key, render):
+        if not self.enabled:
+            return render()
+
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if value is None:
+            value = render()
+            self.backend.set(key, value)
+        return value
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'backend': type(self.backend).__name__,
+            'size': len(self.backend),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0
+        }
@@ -0,0 +1,135 @@
+import json
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.sqlite import insert
+
+
+# --- Імпорт / експорт каталогу рецептів у форматі JSON Lines ---
+# Один рецепт - один рядок JSON з тими ж полями, що й у таблиці recipe.
+# Рядки читаються і пишуться потоково, пачками по batch_size, тож розмір
+# каталогу не впливає на використання пам'яті.
+
+RECIPE_FIELDS = (
+    'id', 'image', 'base_portions', 'category',
+    'title_uk', 'description_uk', 'ingredients_uk', 'instructions_uk',
+    'title_en', 'description_en', 'ingredients_en', 'instructions_en',
+)
+REQUIRED_FIELDS = (
+    'image', 'title_uk', 'description_uk', 'ingredients_uk', 'instructions_uk',
+    'title_en', 'description_en', 'ingredients_en', 'instructions_en',
+)
+DEFAULTS = {'base_portions': 4, 'category': 'classic'}
+
+
+class CatalogError(ValueError):
+    pass
+
+
+def parse_recipe(line, line_number):
+    try:
+        data = json.loads(line)
+    except ValueError as error:
+        raise CatalogError(f'рядок {line_number}: некоректний JSON ({error})')
+    if not isinstance(data, dict):
+        raise CatalogError(f'рядок {line_number}: очікується об\'єкт')
+
+    missing = [field for field in REQUIRED_FIELDS if data.get(field) in (None, '')]
+    if missing:
+        raise CatalogError(f'рядок {line_number}: бракує полів {", ".join(missing)}')
+    for field in ('ingredients_uk', 'ingredients_en'):
+        if not isinstance(data[field], list):
+            raise CatalogError(f'рядок {line_number}: {field} має бути списком')
+
+    row = {field: data.get(field, DEFAULTS.get(field)) for field in RECIPE_FIELDS}
+    if row['id'] is not None and not isinstance(row['id'], int):
+        raise CatalogError(f'рядок {line_number}: id має бути цілим числом')
+    return row
+
+
+def _upsert(table, rows):
+    # INSERT ... ON CONFLICT(id) DO UPDATE: повторний імпорт того ж файлу оновлює
+    # рецепти на місці, а не дублює їх
+    statement = insert(table)
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.id],
+        set_={field: statement.excluded[field] for field in RECIPE_FIELDS if field != 'id'}
+    )
+
+
+def _drop_triggers(connection, table_name):
+    # Повертає визначення тригерів таблиці, щоб відновити їх у тій самій транзакції
+    triggers = connection.execute(
+        text("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = :table"),
+        {'table': table_name}
+    ).all()
+    for name, _ in triggers:
+        connection.exec_driver_sql(f'DROP TRIGGER "{name}"')
+    return triggers
+
+
+def import_recipes(engine, table, lines, batch_size=1000, reindex=()):
+    # Кожна пачка - окрема транзакція: перерваний імпорт можна просто запустити ще раз.
+    # Рецепти без id отримують новий id (звичайна вставка).
+    # Порядкові тригери (пошук, інгредієнти) на час пачки знімаються, а похідні дані
+    # для всієї пачки перебудовують функції reindex(connection, ids_query) - одним
+    # запитом замість тисяч спрацювань тригера. Інші з'єднання бачать лише результат
+    # commit, тобто таблицю вже з тригерами.
+    stats = {'rows': 0, 'batches': 0}
+    batch = []
+
+    def flush():
+        with_id = [row for row in batch if row['id'] is not None]
+        without_id = [{k: v for k, v in row.items() if k != 'id'} for row in batch if row['id'] is None]
+        with engine.begin() as connection:
+            connection.exec_driver_sql('CREATE TEMP TABLE IF NOT EXISTS catalog_batch (id INTEGER PRIMARY KEY)')
+            # Перший DML відкриває транзакцію драйвера, тож DROP TRIGGER нижче вже в ній
+            connection.exec_driver_sql('DELETE FROM temp.catalog_batch')
+            triggers = _drop_triggers(connection, table.name)
+
+            if with_id:
+                connection.execute(_upsert(table, with_id), with_id)
+                connection.execute(text('INSERT OR IGNORE INTO temp.catalog_batch (id) VALUES (:id)'),
+                                   [{'id': row['id']} for row in with_id])
+            if without_id:
+                last_id = connection.execute(select(func.max(table.c.id))).scalar() or 0
+                connection.execute(table.insert(), without_id)
+                connection.execute(text(
+                    f'INSERT OR IGNORE INTO temp.catalog_batch (id) SELECT id FROM "{table.name}" WHERE id > :last_id'
+                ), {'last_id': last_id})
+
+            for rebuild in reindex:
+                rebuild(connection, 'SELECT id FROM temp.catalog_batch')
+            for _, sql in triggers:
+                connection.exec_driver_sql(sql)
+        stats['rows'] += len(batch)
+        stats['batches'] += 1
+        batch.clear()
+
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        batch.append(parse_recipe(line, line_number))
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return stats
+
+
+def export_recipes(engine, table, out, batch_size=1000):
+    # Keyset-обхід за id замість OFFSET: кожна пачка - один діапазонний запит по ключу
+    columns = [table.c[field] for field in RECIPE_FIELDS]
+    last_id = 0
+    count = 0
+    with engine.connect() as connection:
+        while True:
+            rows = connection.execute(
+                select(*columns).where(table.c.id > last_id).order_by(table.c.id).limit(batch_size)
+            ).mappings().all()
+            if not rows:
+                break
+            for row in rows:
+                out.write(json.dumps(dict(row), ensure_ascii=False) + '\n')
+            last_id = rows[-1]['id']
+            count += len(rows)
+    return count
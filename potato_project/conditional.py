@@ -0,0 +1,51 @@
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import request, make_response
+
+
+# --- Умовні GET-запити (ETag / Last-Modified) ---
+# Відповідь описується валідаторами (etag, last_modified), які обчислюються до
+# виконання view: якщо клієнт надіслав той самий ETag, віддаємо 304 без рендеру
+# шаблонів і запитів за даними. ETag слабкий (W/"..."): він позначає зміст
+# сторінки, а не точні байти (стиснення, порядок атрибутів тощо).
+
+def last_modified_from_timestamp(timestamp):
+    # HTTP-дати мають точність до секунди
+    return datetime.fromtimestamp(int(timestamp), timezone.utc)
+
+
+def is_not_modified(etag, last_modified):
+    # If-None-Match має пріоритет: If-Modified-Since перевіряється лише без нього (RFC 9110)
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since is not None and last_modified is not None:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def conditional_get(get_validators):
+    # get_validators() -> (etag, last_modified) або None, якщо відповідь не можна кешувати
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            validators = get_validators()
+            if validators is None:
+                return view(*args, **kwargs)
+
+            etag, last_modified = validators
+            if is_not_modified(etag, last_modified):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            response.last_modified = last_modified
+            # Браузер зберігає відповідь, але щоразу перепитує сервер (дешевий 304).
+            # Зміст залежить від сесії (мова, користувач), тож і від Cookie
+            response.cache_control.no_cache = True
+            response.vary.add('Cookie')
+            return response
+        return wrapper
+    return decorator
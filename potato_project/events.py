@@ -0,0 +1,89 @@
+import queue
+import threading
+
+
+class HubFull(Exception):
+    pass
+
+
+# --- Розсилка подій у межах процесу ---
+# Підписник отримує власну обмежену чергу. Події - лише сповіщення "у темі щось
+# з'явилося": самі дані підписник дочитує з бази, тож переповнена черга нічого не
+# губить (досить одного сповіщення, щоб дочитати все нове), а повільний клієнт
+# не змушує хаб тримати в пам'яті необмежену кількість подій.
+
+class Subscription:
+    def __init__(self, hub, topic, buffer_size):
+        self.hub = hub
+        self.topic = topic
+        self._events = queue.Queue(maxsize=buffer_size)
+        self.closed = False
+
+    def put(self, event):
+        try:
+            self._events.put_nowait(event)
+        except queue.Full:
+            pass  # у черзі вже є непрочитані сповіщення
+
+    def wait(self, timeout):
+        # Повертає всі накопичені події (можливо, порожній список, якщо минув timeout)
+        try:
+            events = [self._events.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class BroadcastHub:
+    def __init__(self, max_subscribers=64, buffer_size=16):
+        self.max_subscribers = max_subscribers
+        self.buffer_size = buffer_size
+        self._topics = {}  # тема -> множина підписок
+        self._count = 0
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic):
+        with self._lock:
+            if self._closed or self._count >= self.max_subscribers:
+                raise HubFull()
+            subscription = Subscription(self, topic, self.buffer_size)
+            self._topics.setdefault(topic, set()).add(subscription)
+            self._count += 1
+            return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._topics.get(subscription.topic)
+            if subscribers is None or subscription not in subscribers:
+                return
+            subscribers.remove(subscription)
+            if not subscribers:
+                del self._topics[subscription.topic]
+            self._count -= 1
+
+    def publish(self, topic, event):
+        with self._lock:
+            subscribers = list(self._topics.get(topic, ()))
+        for subscription in subscribers:
+            subscription.put(event)
+
+    def close(self):
+        # Зупинка воркера: будимо всі потоки-стріми, щоб вони завершились
+        with self._lock:
+            self._closed = True
+            subscriptions = [s for subscribers in self._topics.values() for s in subscribers]
+        for subscription in subscriptions:
+            subscription.closed = True
+            subscription.put(None)
+
+    def stats(self):
+        with self._lock:
+            return {'subscribers': self._count, 'topics': len(self._topics), 'max_subscribers': self.max_subscribers}
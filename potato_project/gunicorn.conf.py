@@ -0,0 +1,64 @@
+import multiprocessing
+import os
+import signal
+
+
+# Запуск з теки potato_project:
+#   RECIPES_SECRET_KEY=... gunicorn -c gunicorn.conf.py
+# kill -HUP <майстер>  - плавний перезапуск воркерів (поточні запити дообслуговуються);
+# з preload_app код застосунку при цьому не перечитується, для нового коду:
+# kill -USR2 <майстер> (стартує новий майстер), потім kill -TERM старому.
+
+wsgi_app = 'wsgi:create_app()'
+bind = os.environ.get('RECIPES_BIND', '0.0.0.0:8000')
+
+# Класична формула gunicorn: 2 воркери на ядро + 1. Потоки (gthread) обслуговують
+# запити, що чекають на SQLite чи пул bcrypt, не займаючи цілий процес.
+workers = int(os.environ.get('RECIPES_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('RECIPES_THREADS', 4))
+
+# Відкритий SSE-стрім відгуків тримає потік весь час з'єднання, тож стрімів на воркер
+# має бути менше, ніж потоків: два потоки завжди лишаються для звичайних запитів.
+# Понад ліміт стрім отримує 503, і сторінка обходиться без живого оновлення відгуків
+os.environ.setdefault('RECIPES_REVIEW_STREAM_MAX_CONNECTIONS', str(max(threads - 2, 0)))
+
+# Застосунок (міграції, збірка статики, каталоги перекладів) завантажується один раз
+# у майстер-процесі, воркери отримують його через fork
+preload_app = True
+
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+# Періодичний перезапуск воркерів обмежує ріст пам'яті (кеші сторінок, фрагментація)
+max_requests = 2000
+max_requests_jitter = 200
+accesslog = '-'
+
+# Кожен веб-воркер має свій пул процесів bcrypt; при багатьох воркерах одного досить
+os.environ.setdefault('RECIPES_PASSWORD_POOL_WORKERS', '1')
+
+
+def post_fork(server, worker):
+    from wsgi import after_fork
+    after_fork()
+
+
+def post_worker_init(worker):
+    # SIGTERM лише просить gthread-воркер не брати нових з'єднань і чекати на поточні
+    # до graceful_timeout, а worker_exit викликається вже після цього. Відкриті стріми
+    # за цей час самі не завершаться, тому закриваємо їх одразу при отриманні сигналу
+    previous = signal.getsignal(signal.SIGTERM)
+
+    def close_streams_and_exit(signum, frame):
+        from wsgi import close_streams
+        close_streams()
+        if callable(previous):
+            previous(signum, frame)
+
+    signal.signal(signal.SIGTERM, close_streams_and_exit)
+
+
+def worker_exit(server, worker):
+    from wsgi import shutdown
+    shutdown(timeout=graceful_timeout)
@@ -0,0 +1,93 @@
+import json
+import os
+import threading
+
+from jinja2.ext import Extension
+from jinja2.lexer import Token
+
+
+# --- Каталоги перекладів ---
+# translations/<мова>.json завантажуються один раз при старті. Відсутні в каталозі
+# ключі беруться з мови за замовчуванням, тож нова мова може бути перекладена частково.
+
+class Catalog(dict):
+    def __init__(self, lang, messages):
+        super().__init__(messages)
+        self.lang = lang
+
+
+def load_catalogs(folder, default_lang):
+    # {мова: Catalog}; мова за замовчуванням іде першою, решта - за алфавітом
+    raw = {}
+    for name in sorted(os.listdir(folder)):
+        lang, extension = os.path.splitext(name)
+        if extension == '.json':
+            with open(os.path.join(folder, name), encoding='utf-8') as f:
+                raw[lang] = json.load(f)
+    if default_lang not in raw:
+        raise ValueError(f'немає каталогу для мови за замовчуванням: {default_lang}')
+
+    base = raw[default_lang]
+    order = [default_lang] + [lang for lang in raw if lang != default_lang]
+    return {lang: Catalog(lang, {**base, **raw[lang]}) for lang in order}
+
+
+def localized(obj, field, lang, default_lang):
+    # title + en -> obj.title_en; якщо такої колонки чи значення немає - мова за замовчуванням
+    return getattr(obj, f'{field}_{lang}', None) or getattr(obj, f'{field}_{default_lang}')
+
+
+# --- Шаблони, скомпільовані окремо для кожної мови ---
+
+class CatalogExtension(Extension):
+    # Підставляє переклади ще під час компіляції шаблону: t.key стає рядковою
+    # константою з каталогу, а lang - кодом мови. Далі оптимізатор Jinja згортає
+    # константи, тож {{ t.key }} компілюється у готовий екранований текст,
+    # а умови на кшталт lang == 'en' обчислюються один раз, а не при кожному рендері.
+    def filter_stream(self, stream):
+        lang = self.environment.i18n_lang
+        catalog = self.environment.i18n_catalog
+        tokens = list(stream)
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            follows_dot = i > 0 and tokens[i - 1].type == 'dot'
+            if token.type == 'name' and not follows_dot:
+                if (token.value == 't' and i + 2 < len(tokens) and tokens[i + 1].type == 'dot'
+                        and tokens[i + 2].type == 'name' and tokens[i + 2].value in catalog):
+                    yield Token(token.lineno, 'string', catalog[tokens[i + 2].value])
+                    i += 3
+                    continue
+                # lang=... (іменований аргумент чи присвоєння) не чіпаємо
+                if token.value == 'lang' and not (i + 1 < len(tokens) and tokens[i + 1].type == 'assign'):
+                    yield Token(token.lineno, 'string', lang)
+                    i += 1
+                    continue
+            yield token
+            i += 1
+
+
+class LocalizedTemplates:
+    # Окреме Jinja-оточення на кожну мову (overlay основного оточення Flask)
+    # зі своїм кешем скомпільованих шаблонів. Оточення створюються при першому
+    # рендері, коли всі глобальні функції та фільтри застосунку вже зареєстровані.
+    def __init__(self, environment, catalogs):
+        self.catalogs = catalogs
+        self._base = environment
+        self._environments = {}
+        self._lock = threading.Lock()
+
+    def environment(self, lang):
+        env = self._environments.get(lang)
+        if env is None:
+            with self._lock:
+                env = self._environments.get(lang)
+                if env is None:
+                    env = self._base.overlay(extensions=[CatalogExtension])
+                    env.i18n_lang = lang
+                    env.i18n_catalog = self.catalogs[lang]
+                    self._environments[lang] = env
+        return env
+
+    def get_template(self, name, lang):
+        return self.environment(lang).get_template(name)
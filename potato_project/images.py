@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import posixpath
+import queue
+import tempfile
+import threading
+import time
+from functools import partial
+
+from cache import LRUBackend
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # без Pillow показуємо лише оригінали
+    Image = None
+
+
+# Розміри, що генеруються для кожного фото відгуку: назва -> ширина в пікселях
+PHOTO_SIZES = {'thumb': 320, 'medium': 800}
+PHOTO_FORMATS = {'jpg': 'JPEG', 'webp': 'WEBP'}
+
+CHUNK_SIZE = 64 * 1024
+
+# mkstemp створює файл з правами 0600, а фото віддає веб-сервер, що може працювати
+# під іншим користувачем - тому права виставляються явно, на дескрипторі
+FILE_MODE = 0o644
+
+# Описи варіантів фото не змінюються (ім'я фото - хеш вмісту), тож прочитаний
+# опис тримаємо в пам'яті, а не відкриваємо файл для кожного відгуку на кожному рендері
+_variant_widths = LRUBackend(max_size=4096)
+
+
+def _make_temp(folder):
+    # Унікальний тимчасовий файл поруч із цільовим (os.replace - в межах однієї ФС):
+    # кілька воркерів, що обробляють те саме фото, не пишуть в один і той самий файл
+    fd, temp_path = tempfile.mkstemp(dir=folder, prefix='.', suffix='.part')
+    if hasattr(os, 'fchmod'):  # на Windows прав у цьому сенсі немає
+        os.fchmod(fd, FILE_MODE)
+    return fd, temp_path
+
+
+def save_upload(file, upload_folder, extension):
+    # Потоково пише файл у тимчасовий, паралельно рахуючи sha256.
+    # Ім'я файлу - хеш вмісту, тож однакові фото зберігаються один раз,
+    # а різні фото з однаковою назвою більше не перезаписують одне одного.
+    digest = hashlib.sha256()
+    fd, temp_path = _make_temp(upload_folder)
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            for chunk in iter(lambda: file.stream.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+                temp_file.write(chunk)
+
+        filename = f'{digest.hexdigest()[:32]}.{extension}'
+        final_path = os.path.join(upload_folder, filename)
+        if os.path.exists(final_path):
+            os.remove(temp_path)
+            return filename, False
+        os.replace(temp_path, final_path)
+        return filename, True
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def variant_filename(filename, size, fmt):
+    stem = filename.rsplit('.', 1)[0]
+    return f'{stem}_{size}.{fmt}'
+
+
+def variants_filename(filename):
+    # Опис готових варіантів: {назва розміру: справжня ширина в пікселях}
+    stem = filename.rsplit('.', 1)[0]
+    return f'{stem}.variants.json'
+
+
+def photo_variants(static_folder, photo):
+    # {'jpg': [(шлях, ширина), ...], 'webp': [...]} для вже готових варіантів;
+    # поки фото ще обробляється (або воно менше за найменший розмір), словник
+    # порожній і показується оригінал
+    folder, filename = posixpath.split(photo)
+    path = os.path.join(static_folder, folder, variants_filename(filename))
+    widths = _variant_widths.get(path)
+    if widths is None:
+        try:
+            with open(path, encoding='utf-8') as f:
+                widths = json.load(f)
+        except (OSError, ValueError):
+            return {}  # ще обробляється - не кешуємо, перевіримо наступного разу
+        _variant_widths.set(path, widths)
+    if not widths:
+        return {}
+    return {
+        fmt: [(posixpath.join(folder, variant_filename(filename, size, fmt)), width) for size, width in widths.items()]
+        for fmt in PHOTO_FORMATS
+    }
+
+
+def _write_atomic(target, write):
+    # Пишемо в тимчасовий файл і перейменовуємо, щоб не віддати напівзаписаний файл
+    fd, temp_target = _make_temp(os.path.dirname(target))
+    os.close(fd)
+    try:
+        write(temp_target)
+        os.replace(temp_target, target)
+    except BaseException:
+        if os.path.exists(temp_target):
+            os.remove(temp_target)
+        raise
+
+
+def _render_variants(path):
+    folder, filename = os.path.split(path)
+    with Image.open(path) as original:
+        image = ImageOps.exif_transpose(original).convert('RGB')
+
+    widths = {}
+    for size, width in PHOTO_SIZES.items():
+        # Збільшена копія важча за оригінал і не різкіша - такий розмір пропускаємо
+        if image.width <= width:
+            continue
+        resized = image.copy()
+        resized.thumbnail((width, width * 4))
+        for fmt, pil_format in PHOTO_FORMATS.items():
+            target = os.path.join(folder, variant_filename(filename, size, fmt))
+            if not os.path.exists(target):
+                _write_atomic(target, partial(resized.save, format=pil_format, quality=82, optimize=True))
+        # thumbnail зберігає пропорції: у дуже високого фото ширина менша за задану
+        widths[size] = resized.width
+
+    # Опис пишеться останнім: поки його немає, сторінки показують оригінал
+    def write_widths(temp_target):
+        with open(temp_target, 'w', encoding='utf-8') as f:
+            json.dump(widths, f)
+    _write_atomic(os.path.join(folder, variants_filename(filename)), write_widths)
+
+
+class ImagePipeline:
+    # Фонова обробка фото: запит add_review лише ставить файл у чергу
+    # і одразу повертає відповідь
+    def __init__(self, max_queue=256):
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return Image is not None
+
+    def submit(self, path, on_done=None):
+        if not self.enabled:
+            return False
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((path, on_done))
+        except queue.Full:
+            return False
+        return True
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='image-pipeline', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            path, on_done = self._queue.get()
+            try:
+                _render_variants(path)
+                if on_done is not None:
+                    on_done()
+            except Exception as error:
+                print(f"Не вдалося обробити фото {path}: {error}")
+            finally:
+                self._queue.task_done()
+
+    def join(self, timeout=None):
+        # Чекає, доки черга спорожніє; з timeout повертає False, якщо не встигла
+        if timeout is None:
+            self._queue.join()
+            return True
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
@@ -0,0 +1,101 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class IngestQueueFull(Exception):
+    pass
+
+
+# --- Черга записів з груповим commit ---
+# У SQLite усі записи йдуть через одне глобальне блокування, тож сотня відгуків,
+# збережених окремими commit, виконується строго по черзі. Тут запити лише ставлять
+# запис у чергу, а єдиний потік-записувач збирає їх у пачки (до batch_size записів
+# або interval секунд очікування) і зберігає кожну пачку однією транзакцією.
+
+class GroupCommitQueue:
+    # flush(items) зберігає пачку в одній транзакції; якщо вона падає, записи пачки
+    # повторюються поодинці, щоб один поганий запис не губив решту.
+    # observe(batch_size, seconds) - необов'язковий хук для метрик
+    def __init__(self, flush, max_pending=1000, batch_size=200, interval=0.05, observe=None, name='group-commit'):
+        self.flush = flush
+        self.batch_size = batch_size
+        self.interval = interval
+        self.observe = observe
+        self.name = name
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, item):
+        # -> Future, що завершується після commit пачки (або з помилкою запису).
+        # Якщо черга повна - IngestQueueFull одразу, без очікування
+        future = Future()
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((item, future))
+        except queue.Full:
+            raise IngestQueueFull()
+        return future
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def _ensure_worker(self):
+        # Потік стартує при першому записі: з preload_app потоки майстер-процесу
+        # у воркери gunicorn не переходять
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            started = time.perf_counter()
+            try:
+                self._flush_batch(batch)
+            finally:
+                if self.observe is not None:
+                    self.observe(len(batch), time.perf_counter() - started)
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _flush_batch(self, batch):
+        try:
+            self.flush([item for item, _ in batch])
+        except Exception as error:
+            if len(batch) > 1:
+                for entry in batch:
+                    self._flush_batch([entry])
+            else:
+                print(f"Не вдалося зберегти запис з черги {self.name}: {error}")
+                batch[0][1].set_exception(error)
+            return
+        for _, future in batch:
+            future.set_result(True)
+
+    def join(self, timeout=None):
+        # Чекає, доки всі записи з черги збережуться; з timeout повертає False, якщо не встигла
+        if timeout is None:
+            self._queue.join()
+            return True
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
@@ -0,0 +1,200 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from werkzeug.middleware.profiler import ProfilerMiddleware
+
+
+# --- Метрики у форматі Prometheus ---
+# Реєстр живе в пам'яті процесу: при кількох воркерах gunicorn /metrics показує
+# лічильники того воркера, що обслужив запит (для зведених значень потрібен
+# спільний збирач, напр. multiprocess-режим prometheus_client).
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # останній - +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, **extra):
+    items = list(labels) + list(extra.items())
+    if not items:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in items) + '}'
+
+
+def _format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    # Якщо enabled=False, observe/inc/timer нічого не роблять, а хуки запитів
+    # і SQL взагалі не встановлюються (див. install_metrics)
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._metrics = {}       # назва -> (тип, опис, кошики)
+        self._values = {}        # (назва, мітки) -> Histogram або число
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def histogram(self, name, description, buckets=LATENCY_BUCKETS):
+        self._metrics[name] = ('histogram', description, buckets)
+
+    def counter(self, name, description):
+        self._metrics[name] = ('counter', description, None)
+
+    def add_collector(self, collect):
+        # collect() -> [(назва, тип, опис, значення)], рахується в момент запиту /metrics
+        self._collectors.append(collect)
+
+    def observe(self, name, value, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._values.get(key)
+            if histogram is None:
+                histogram = self._values[key] = Histogram(self._metrics[name][2])
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    @contextmanager
+    def timer(self, name, **labels):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def render(self):
+        with self._lock:
+            values = sorted(
+                (key, (value.counts[:], value.sum, value.count) if isinstance(value, Histogram) else value)
+                for key, value in self._values.items()
+            )
+
+        lines = []
+        for name, (kind, description, buckets) in sorted(self._metrics.items()):
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {kind}')
+            for (value_name, labels), value in values:
+                if value_name != name:
+                    continue
+                if kind == 'histogram':
+                    counts, total, count = value
+                    cumulative = 0
+                    for bound, bucket_count in zip(list(buckets) + ['+Inf'], counts):
+                        cumulative += bucket_count
+                        lines.append(f'{name}_bucket{_format_labels(labels, le=bound)} {cumulative}')
+                    lines.append(f'{name}_sum{_format_labels(labels)} {_format_number(total)}')
+                    lines.append(f'{name}_count{_format_labels(labels)} {count}')
+                else:
+                    lines.append(f'{name}{_format_labels(labels)} {_format_number(value)}')
+
+        for collect in self._collectors:
+            for name, kind, description, value in collect():
+                lines.append(f'# HELP {name} {description}')
+                lines.append(f'# TYPE {name} {kind}')
+                lines.append(f'{name} {_format_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+# --- Хуки запитів і SQL ---
+
+def _route_label():
+    # Шаблон маршруту (/recipe/<int:recipe_id>/panel), а не сам URL - інакше
+    # кожен id рецепта створював би окремий ряд метрик
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+def install_metrics(app, registry):
+    registry.histogram('recipes_request_duration_seconds', 'Час обробки запиту за маршрутом')
+    registry.counter('recipes_requests_total', 'Кількість запитів за маршрутом і статусом')
+    registry.histogram('recipes_request_sql_queries', 'SQL-запитів на один HTTP-запит', COUNT_BUCKETS)
+    registry.histogram('recipes_request_sql_seconds', 'Сумарний час SQL на один HTTP-запит')
+
+    @app.before_request
+    def _start_request_metrics():
+        g.metrics = {'start': time.perf_counter(), 'sql_queries': 0, 'sql_seconds': 0.0, 'status': 500}
+
+    @app.after_request
+    def _remember_status(response):
+        if 'metrics' in g:
+            g.metrics['status'] = response.status_code
+        return response
+
+    @app.teardown_request
+    def _finish_request_metrics(error=None):
+        state = g.pop('metrics', None)
+        if state is None:
+            return
+        route = _route_label()
+        registry.observe('recipes_request_duration_seconds', time.perf_counter() - state['start'],
+                         route=route, method=request.method)
+        registry.inc('recipes_requests_total', route=route, method=request.method, status=state['status'])
+        registry.observe('recipes_request_sql_queries', state['sql_queries'], route=route)
+        registry.observe('recipes_request_sql_seconds', state['sql_seconds'], route=route)
+
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_start = time.perf_counter()
+
+    @event.listens_for(Engine, 'after_cursor_execute')
+    def _finish_query_timer(conn, cursor, statement, parameters, context, executemany):
+        # Запити з фонових потоків (обробка фото) до HTTP-запитів не належать
+        start = getattr(context, '_metrics_start', None)
+        if start is None or not has_request_context() or 'metrics' not in g:
+            return
+        g.metrics['sql_queries'] += 1
+        g.metrics['sql_seconds'] += time.perf_counter() - start
+
+
+# --- Профайлер окремих запитів ---
+
+class OptInProfiler:
+    # WSGI-обгортка: під cProfile виконуються лише запити із заголовком X-Profile: 1,
+    # результат пишеться у profile_dir (.prof, відкривається pstats / snakeviz).
+    # Решта запитів іде напряму, без накладних витрат профайлера.
+    def __init__(self, wsgi_app, profile_dir, header='HTTP_X_PROFILE'):
+        self.wsgi_app = wsgi_app
+        self.header = header
+        self.profiled_app = ProfilerMiddleware(
+            wsgi_app,
+            stream=None,
+            profile_dir=profile_dir,
+            filename_format='{method}.{path}.{elapsed:.0f}ms.{time:.0f}.prof'
+        )
+
+    def __call__(self, environ, start_response):
+        if environ.get(self.header) == '1':
+            return self.profiled_app(environ, start_response)
+        return self.wsgi_app(environ, start_response)
@@ -0,0 +1,357 @@
+from sqlalchemy import text
+
+from search import init_search
+
+
+# --- Версійні міграції схеми ---
+# Таблиці та індекси моделей створює db.create_all(); міграції відповідають за те,
+# чого ORM не описує (віртуальні таблиці, тригери) і за перенесення вже наявних даних.
+# Номер останньої застосованої міграції зберігається в заголовку самої бази
+# (PRAGMA user_version), тож окрема службова таблиця не потрібна.
+
+
+# --- 1. Повнотекстовий пошук ---
+
+def _create_search_index(connection):
+    init_search(connection)
+
+
+# --- 2. Нормалізовані інгредієнти ---
+# JSON-колонки ingredients_uk / ingredients_en лишаються джерелом для сторінок
+# рецептів, а таблиці ingredient / recipe_ingredient підтримуються тригерами.
+# Списки двома мовами зіставляються за позицією; кількість і БЖУ беруться з
+# української версії (вони однакові в обох мовах), назви та одиниці - свої для кожної.
+
+_INGREDIENT_PAIRS = """
+    SELECT {row}.id AS recipe_id, CAST(uk.key AS INTEGER) AS position,
+        trim(json_extract(uk.value, '$.name')) AS name_uk,
+        trim(coalesce(json_extract(en.value, '$.name'), json_extract(uk.value, '$.name'))) AS name_en,
+        coalesce(json_extract(uk.value, '$.amount'), 0) AS amount,
+        json_extract(uk.value, '$.unit') AS unit_uk,
+        coalesce(json_extract(en.value, '$.unit'), json_extract(uk.value, '$.unit')) AS unit_en,
+        coalesce(json_extract(uk.value, '$.p'), 0) AS p,
+        coalesce(json_extract(uk.value, '$.f'), 0) AS f,
+        coalesce(json_extract(uk.value, '$.c'), 0) AS c
+    FROM {source}json_each({row}.ingredients_uk) AS uk
+    LEFT JOIN json_each({row}.ingredients_en) AS en ON en.key = uk.key
+    {where}
+"""
+
+# WITH не можна використовувати всередині тригерів, тож пари вибираються двічі:
+# спершу для довідника продуктів, потім для рядків рецепта.
+# Замість INSERT OR IGNORE - явна перевірка NOT EXISTS: для тригерів SQLite
+# підміняє OR-обробку конфліктів на ту, що має зовнішній запит (напр. upsert імпорту)
+_SYNC_INGREDIENTS = """
+    INSERT INTO ingredient (name_uk, name_en)
+    SELECT DISTINCT name_uk, name_en FROM ({pairs}) AS pairs
+    WHERE NOT EXISTS (
+        SELECT 1 FROM ingredient
+        WHERE ingredient.name_uk = pairs.name_uk AND ingredient.name_en = pairs.name_en
+    );
+    INSERT INTO recipe_ingredient (recipe_id, ingredient_id, position, amount, unit_uk, unit_en, p, f, c)
+    SELECT pairs.recipe_id, ingredient.id, pairs.position, pairs.amount,
+        pairs.unit_uk, pairs.unit_en, pairs.p, pairs.f, pairs.c
+    FROM ({pairs}) AS pairs
+    JOIN ingredient ON ingredient.name_uk = pairs.name_uk AND ingredient.name_en = pairs.name_en;
+"""
+
+_TRIGGER_SYNC = _SYNC_INGREDIENTS.format(pairs=_INGREDIENT_PAIRS.format(row='new', source='', where=''))
+
+INGREDIENT_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS recipe_ingredients_insert AFTER INSERT ON recipe BEGIN
+        {_TRIGGER_SYNC}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS recipe_ingredients_update
+    AFTER UPDATE OF ingredients_uk, ingredients_en ON recipe BEGIN
+        DELETE FROM recipe_ingredient WHERE recipe_id = old.id;
+        {_TRIGGER_SYNC}
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS recipe_ingredients_delete AFTER DELETE ON recipe BEGIN
+        DELETE FROM recipe_ingredient WHERE recipe_id = old.id;
+    END
+    """,
+]
+
+
+def sync_recipe_ingredients(connection, ids_query):
+    # Перебудовує рядки recipe_ingredient для рецептів з ids_query (SELECT id ...)
+    connection.execute(text(f'DELETE FROM recipe_ingredient WHERE recipe_id IN ({ids_query})'))
+    pairs = _INGREDIENT_PAIRS.format(row='recipe', source='recipe, ', where=f'WHERE recipe.id IN ({ids_query})')
+    # Поза тригером JSON можна розібрати один раз - у тимчасову таблицю пар
+    connection.execute(text('DROP TABLE IF EXISTS temp.ingredient_pairs'))
+    connection.execute(text(f'CREATE TEMP TABLE ingredient_pairs AS {pairs}'))
+    for statement in _SYNC_INGREDIENTS.format(pairs='SELECT * FROM temp.ingredient_pairs').split(';'):
+        if statement.strip():
+            connection.execute(text(statement))
+    connection.execute(text('DROP TABLE temp.ingredient_pairs'))
+
+
+def _normalize_ingredients(connection):
+    for statement in INGREDIENT_TRIGGERS:
+        connection.execute(text(statement))
+    # Переносимо вже наявні рецепти
+    sync_recipe_ingredients(connection, 'SELECT id FROM recipe')
+
+
+def _recreate_ingredient_triggers(connection):
+    for name in ('recipe_ingredients_insert', 'recipe_ingredients_update', 'recipe_ingredients_delete'):
+        connection.execute(text(f'DROP TRIGGER IF EXISTS {name}'))
+    for statement in INGREDIENT_TRIGGERS:
+        connection.execute(text(statement))
+
+
+# --- 4. Лічильники відгуків ---
+# recipe.review_count / recipe.photo_count - денормалізовані агрегати, щоб панель
+# і сортування за популярністю не рахували відгуки при кожному запиті.
+# Тригери оновлюють їх у тій самій транзакції, що й зміну відгуку; якщо лічильники
+# все ж розійдуться з даними (ручні правки бази), їх лагодить rebuild_review_counters.
+
+_HAS_PHOTO = "(coalesce({row}.photo, '') != '')"
+
+REVIEW_COUNTER_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS review_counters_insert AFTER INSERT ON review BEGIN
+        UPDATE recipe SET review_count = review_count + 1,
+            photo_count = photo_count + {_HAS_PHOTO.format(row='new')}
+        WHERE id = new.recipe_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS review_counters_update AFTER UPDATE OF recipe_id, photo ON review BEGIN
+        UPDATE recipe SET review_count = review_count - 1,
+            photo_count = photo_count - {_HAS_PHOTO.format(row='old')}
+        WHERE id = old.recipe_id;
+        UPDATE recipe SET review_count = review_count + 1,
+            photo_count = photo_count + {_HAS_PHOTO.format(row='new')}
+        WHERE id = new.recipe_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS review_counters_delete AFTER DELETE ON review BEGIN
+        UPDATE recipe SET review_count = review_count - 1,
+            photo_count = photo_count - {_HAS_PHOTO.format(row='old')}
+        WHERE id = old.recipe_id;
+    END
+    """,
+]
+
+
+def rebuild_review_counters(connection, ids_query='SELECT id FROM recipe'):
+    # Перераховує лічильники рецептів з ids_query (SELECT id ...) за таблицею review.
+    # Оновлюються лише рядки, що розійшлися з даними; повертає їх кількість
+    result = connection.execute(text(f"""
+        UPDATE recipe SET review_count = counts.reviews, photo_count = counts.photos
+        FROM (
+            SELECT recipe.id AS recipe_id,
+                (SELECT count(*) FROM review WHERE review.recipe_id = recipe.id) AS reviews,
+                (SELECT count(*) FROM review
+                 WHERE review.recipe_id = recipe.id AND {_HAS_PHOTO.format(row='review')}) AS photos
+            FROM recipe WHERE recipe.id IN ({ids_query})
+        ) AS counts
+        WHERE recipe.id = counts.recipe_id
+            AND (recipe.review_count != counts.reviews OR recipe.photo_count != counts.photos)
+    """))
+    return result.rowcount
+
+
+def _add_review_counters(connection):
+    # У новій базі колонки вже створив db.create_all(), у старій - додаємо
+    columns = {row[1] for row in connection.execute(text('PRAGMA table_info(recipe)'))}
+    for column in ('review_count', 'photo_count'):
+        if column not in columns:
+            connection.execute(text(f'ALTER TABLE recipe ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0'))
+    # Тригер пошуку реагував на будь-яке оновлення рецепта, зокрема і лічильників
+    connection.execute(text('DROP TRIGGER IF EXISTS recipe_fts_update'))
+    init_search(connection)
+    for statement in REVIEW_COUNTER_TRIGGERS:
+        connection.execute(text(statement))
+    rebuild_review_counters(connection)
+
+
+# --- 5. Версія вмісту ---
+# Один рядок content_version: номер збільшується при кожній зміні рецептів, відгуків
+# чи імен користувачів. З нього будуються ETag сторінок, тож воркери gunicorn
+# (окремі процеси) бачать однакову версію, на відміну від лічильника в пам'яті.
+
+_UNIX_NOW = "((julianday('now') - 2440587.5) * 86400.0)"
+_BUMP_VERSION = f'UPDATE content_version SET version = version + 1, updated_at = {_UNIX_NOW} WHERE id = 1'
+
+# Лічильники відгуків (review_count / photo_count) сюди не входять: їх зміну вже
+# відловлюють тригери на review
+_RECIPE_CONTENT_COLUMNS = """id, image, base_portions, category,
+    title_uk, description_uk, ingredients_uk, instructions_uk,
+    title_en, description_en, ingredients_en, instructions_en"""
+
+CONTENT_VERSION_TRIGGERS = [
+    f"CREATE TRIGGER IF NOT EXISTS content_version_recipe_insert AFTER INSERT ON recipe BEGIN {_BUMP_VERSION}; END",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS content_version_recipe_update
+    AFTER UPDATE OF {_RECIPE_CONTENT_COLUMNS} ON recipe BEGIN {_BUMP_VERSION}; END
+    """,
+    f"CREATE TRIGGER IF NOT EXISTS content_version_recipe_delete AFTER DELETE ON recipe BEGIN {_BUMP_VERSION}; END",
+    f"CREATE TRIGGER IF NOT EXISTS content_version_review_insert AFTER INSERT ON review BEGIN {_BUMP_VERSION}; END",
+    f"CREATE TRIGGER IF NOT EXISTS content_version_review_update AFTER UPDATE ON review BEGIN {_BUMP_VERSION}; END",
+    f"CREATE TRIGGER IF NOT EXISTS content_version_review_delete AFTER DELETE ON review BEGIN {_BUMP_VERSION}; END",
+    # Ім'я (або email, якщо імені немає) показується в меню та підписах відгуків
+    f"""
+    CREATE TRIGGER IF NOT EXISTS content_version_user_update
+    AFTER UPDATE OF email, first_name, last_name ON user BEGIN {_BUMP_VERSION}; END
+    """,
+]
+
+
+def bump_content_version(connection, ids_query=None):
+    # Для змін в обхід тригерів: імпорт каталогу (тригери рецептів на час пачки
+    # зняті - сигнатура як у функцій reindex) чи готові мініатюри фото
+    connection.execute(text(_BUMP_VERSION))
+
+
+def read_versions(connection, recipe_id=None):
+    # -> (версія вмісту, час її останньої зміни в секундах Unix, версія каталогу,
+    #     версія рецепта recipe_id - None, якщо його немає чи recipe_id не задано) одним запитом
+    return tuple(connection.execute(text(
+        'SELECT version, updated_at, catalog_version, (SELECT version FROM recipe WHERE id = :recipe_id) '
+        'FROM content_version WHERE id = 1'
+    ), {'recipe_id': recipe_id}).one())
+
+
+def _create_content_version(connection):
+    connection.execute(text(
+        'CREATE TABLE IF NOT EXISTS content_version ('
+        'id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL, updated_at REAL NOT NULL)'
+    ))
+    connection.execute(text(f'INSERT OR IGNORE INTO content_version (id, version, updated_at) VALUES (1, 1, {_UNIX_NOW})'))
+    for statement in CONTENT_VERSION_TRIGGERS:
+        connection.execute(text(statement))
+
+
+# --- 6. Версія каталогу ---
+# Окремий номер лише для змін самих рецептів: від нього залежать дані, що будуються
+# в пам'яті процесу з усього каталогу (калькулятор, пошук за продуктами, меню,
+# офлайн-пакет). Версія вмісту для них не годиться - вона змінюється з кожним відгуком.
+
+_BUMP_CATALOG = 'UPDATE content_version SET catalog_version = catalog_version + 1 WHERE id = 1'
+
+CATALOG_VERSION_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS catalog_version_recipe_insert AFTER INSERT ON recipe BEGIN
+        {_BUMP_VERSION}; {_BUMP_CATALOG};
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS catalog_version_recipe_update
+    AFTER UPDATE OF {_RECIPE_CONTENT_COLUMNS} ON recipe BEGIN
+        {_BUMP_VERSION}; {_BUMP_CATALOG};
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS catalog_version_recipe_delete AFTER DELETE ON recipe BEGIN
+        {_BUMP_VERSION}; {_BUMP_CATALOG};
+    END
+    """,
+]
+
+
+def bump_catalog_version(connection, ids_query=None):
+    # Зміна каталогу в обхід тригерів (імпорт) - нові і версія вмісту, і версія каталогу
+    connection.execute(text(_BUMP_VERSION))
+    connection.execute(text(_BUMP_CATALOG))
+
+
+def _add_catalog_version(connection):
+    columns = {row[1] for row in connection.execute(text('PRAGMA table_info(content_version)'))}
+    if 'catalog_version' not in columns:
+        connection.execute(text('ALTER TABLE content_version ADD COLUMN catalog_version INTEGER NOT NULL DEFAULT 1'))
+    # Тригери рецептів з міграції 5 замінюються тими, що змінюють обидві версії
+    for name in ('content_version_recipe_insert', 'content_version_recipe_update', 'content_version_recipe_delete'):
+        connection.execute(text(f'DROP TRIGGER IF EXISTS {name}'))
+    for statement in CATALOG_VERSION_TRIGGERS:
+        connection.execute(text(statement))
+
+
+# --- 7. Версії рецептів ---
+# Панель рецепта залежить від каталогу (сам рецепт, назви схожих) і від власних
+# відгуків з іменами авторів. Для другого - номер у рядку рецепта: відгук чи
+# перейменування автора змінюють панелі лише тих рецептів, яких вони стосуються,
+# а не всі сторінки сайту, як загальна версія вмісту.
+
+_BUMP_RECIPES = 'UPDATE recipe SET version = version + 1 WHERE'
+
+RECIPE_VERSION_TRIGGERS = [
+    f"CREATE TRIGGER IF NOT EXISTS recipe_version_review_insert AFTER INSERT ON review BEGIN {_BUMP_RECIPES} id = new.recipe_id; END",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS recipe_version_review_update AFTER UPDATE ON review BEGIN
+        {_BUMP_RECIPES} id = old.recipe_id;
+        {_BUMP_RECIPES} id = new.recipe_id AND new.recipe_id != old.recipe_id;
+    END
+    """,
+    f"CREATE TRIGGER IF NOT EXISTS recipe_version_review_delete AFTER DELETE ON review BEGIN {_BUMP_RECIPES} id = old.recipe_id; END",
+    # Підпис відгуку - ім'я автора або email
+    f"""
+    CREATE TRIGGER IF NOT EXISTS recipe_version_user_update AFTER UPDATE OF email, first_name ON user BEGIN
+        {_BUMP_RECIPES} id IN (SELECT recipe_id FROM review WHERE user_id = new.id);
+    END
+    """,
+]
+
+
+def bump_recipe_versions(connection, ids_query='SELECT id FROM recipe'):
+    # Зміни в обхід тригерів: готові мініатюри фото відгуку, перерахунок схожих рецептів
+    connection.execute(text(f'{_BUMP_RECIPES} id IN ({ids_query})'))
+    connection.execute(text(_BUMP_VERSION))
+
+
+def _add_recipe_versions(connection):
+    columns = {row[1] for row in connection.execute(text('PRAGMA table_info(recipe)'))}
+    if 'version' not in columns:
+        connection.execute(text('ALTER TABLE recipe ADD COLUMN version INTEGER NOT NULL DEFAULT 1'))
+    for statement in RECIPE_VERSION_TRIGGERS:
+        connection.execute(text(statement))
+
+
+# (номер, опис, функція); нові міграції лише додаються в кінець списку
+MIGRATIONS = [
+    (1, 'FTS5-індекс рецептів і відгуків', _create_search_index),
+    (2, 'нормалізовані інгредієнти (ingredient, recipe_ingredient)', _normalize_ingredients),
+    (3, 'тригери інгредієнтів сумісні з upsert', _recreate_ingredient_triggers),
+    (4, 'лічильники відгуків і фото рецептів', _add_review_counters),
+    (5, 'версія вмісту для ETag', _create_content_version),
+    (6, 'версія каталогу рецептів', _add_catalog_version),
+    (7, 'версії рецептів для кешу панелей', _add_recipe_versions),
+]
+
+
+def schema_version(connection):
+    return connection.execute(text('PRAGMA user_version')).scalar()
+
+
+def run_migrations(engine):
+    # Кожна міграція виконується у власній транзакції разом зі зміною user_version,
+    # тож перервана міграція не залишає базу "наполовину оновленою".
+    # pysqlite сам відкриває транзакцію лише перед INSERT/UPDATE/DELETE, а CREATE
+    # виконує в autocommit - тому драйвер переводимо в autocommit і BEGIN/COMMIT
+    # пишемо явно (DDL у SQLite транзакційний і відкочується разом з рештою)
+    applied = []
+    with engine.connect() as connection:
+        connection = connection.execution_options(isolation_level='AUTOCOMMIT')
+        for version, description, migrate in MIGRATIONS:
+            # IMMEDIATE: одразу блокування на запис, щоб два процеси не застосували одну міграцію
+            connection.exec_driver_sql('BEGIN IMMEDIATE')
+            try:
+                if schema_version(connection) >= version:
+                    connection.exec_driver_sql('ROLLBACK')
+                    continue
+                migrate(connection)
+                connection.execute(text(f'PRAGMA user_version = {version}'))
+            except BaseException:
+                connection.exec_driver_sql('ROLLBACK')
+                raise
+            connection.exec_driver_sql('COMMIT')
+            print(f"Міграція {version}: {description}")
+            applied.append(version)
+    return applied
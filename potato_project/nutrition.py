@@ -0,0 +1,158 @@
+import numpy as np
+
+
+MACROS = ('p', 'f', 'c')
+
+# Одиниця з рецепта -> (канонічна одиниця, множник до неї)
+UNIT_ALIASES = {
+    'g': ('g', 1), 'г': ('g', 1), 'kg': ('g', 1000), 'кг': ('g', 1000),
+    'ml': ('ml', 1), 'мл': ('ml', 1), 'l': ('ml', 1000), 'л': ('ml', 1000),
+    'tbsp': ('tbsp', 1), 'ст.л.': ('tbsp', 1),
+    'tsp': ('tsp', 1), 'ч.л.': ('tsp', 1),
+    'pc': ('pcs', 1), 'pcs': ('pcs', 1), 'шт.': ('pcs', 1),
+    'cloves': ('cloves', 1), 'зуб.': ('cloves', 1),
+    'stalks': ('stalks', 1), 'стебла': ('stalks', 1),
+    'cm': ('cm', 1), 'см': ('cm', 1),
+    'to taste': ('to taste', 0), 'за смаком': ('to taste', 0),
+}
+
+# Великі суми показуємо у кг / л
+LARGER_UNITS = {'g': ('kg', 1000), 'ml': ('l', 1000)}
+
+UNIT_LABELS = {
+    'uk': {'g': 'г', 'kg': 'кг', 'ml': 'мл', 'l': 'л', 'tbsp': 'ст.л.', 'tsp': 'ч.л.', 'pcs': 'шт.',
+           'cloves': 'зуб.', 'stalks': 'стебла', 'cm': 'см', 'to taste': 'за смаком'},
+    'en': {'g': 'g', 'kg': 'kg', 'ml': 'ml', 'l': 'L', 'tbsp': 'tbsp', 'tsp': 'tsp', 'pcs': 'pcs',
+           'cloves': 'cloves', 'stalks': 'stalks', 'cm': 'cm', 'to taste': 'to taste'},
+}
+
+
+def normalize_unit(unit):
+    return UNIT_ALIASES.get(unit.strip().lower(), (unit, 1))
+
+def unit_label(unit, lang):
+    return UNIT_LABELS.get(lang, {}).get(unit, unit)
+
+
+class _LanguageTable:
+    # Назви та одиниці інгредієнтів однією мовою; кількості та БЖУ спільні для всіх мов
+    def __init__(self, names, units, lang):
+        self.names = names
+        self.units = units
+
+        # Для списку покупок: однакові продукти (за назвою та канонічною одиницею)
+        # з різних рецептів отримують спільний індекс key_idx
+        canonical = [normalize_unit(unit) for unit in self.units]
+        self.unit_factors = np.array([factor for _, factor in canonical], dtype=np.float64)
+        key_positions = {}
+        self.keys = []
+        key_idx = []
+        for name, (unit, _) in zip(self.names, canonical):
+            key = (name.strip().lower(), unit)
+            if key not in key_positions:
+                key_positions[key] = len(self.keys)
+                self.keys.append((name.strip(), unit))
+            key_idx.append(key_positions[key])
+        self.key_idx = np.array(key_idx, dtype=np.int64)
+        self.lang = lang
+
+
+class NutritionEngine:
+    # recipes - пари (id, base_portions) за зростанням id; ingredients - рядки
+    # recipe_ingredient (recipe_id, amount, unit_<мова>, name_<мова>), впорядковані
+    # за рецептом і позицією; macro_totals - (recipe_id, p, f, c), пораховані в SQL.
+    # Інгредієнти всіх рецептів лежать у плоских масивах (як CSR-матриця):
+    # інгредієнти рецепта з рядком row - це [offsets[row]:offsets[row + 1]]
+    def __init__(self, recipes, ingredients, macro_totals, languages):
+        self.recipe_ids = [recipe_id for recipe_id, _ in recipes]
+        self.row_by_id = {recipe_id: row for row, recipe_id in enumerate(self.recipe_ids)}
+        self.base_portions = np.array(
+            [max(base_portions or 1, 1) for _, base_portions in recipes], dtype=np.float64
+        )
+
+        owner = np.array([self.row_by_id[item.recipe_id] for item in ingredients], dtype=np.int64)
+        lengths = np.bincount(owner, minlength=len(recipes))
+        self.offsets = np.zeros(len(recipes) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.offsets[1:])
+
+        # Усе зберігаємо вже "на одну порцію", тож масштабування - одне множення
+        amounts = np.array([item.amount or 0 for item in ingredients], dtype=np.float64)
+        self.amount_per_portion = amounts / self.base_portions[owner]
+        self.macros_per_portion = np.zeros((len(recipes), len(MACROS)), dtype=np.float64)
+        for recipe_id, *totals in macro_totals:
+            row = self.row_by_id.get(recipe_id)
+            if row is not None:
+                self.macros_per_portion[row] = np.array(totals, dtype=np.float64) / self.base_portions[row]
+
+        self.tables = {
+            lang: _LanguageTable([getattr(item, f'name_{lang}') for item in ingredients],
+                                 [getattr(item, f'unit_{lang}') or '' for item in ingredients], lang)
+            for lang in languages
+        }
+
+    def unknown_ids(self, recipe_ids):
+        return [recipe_id for recipe_id in recipe_ids if recipe_id not in self.row_by_id]
+
+    def scale(self, recipe_ids, portions):
+        # Повертає (rows, lengths, ingredient_idx, amounts, macros) для всіх пар
+        # (рецепт, порції) одразу - без циклу Python по інгредієнтах
+        rows = np.array([self.row_by_id[recipe_id] for recipe_id in recipe_ids], dtype=np.int64)
+        portions = np.asarray(portions, dtype=np.float64)
+
+        starts = self.offsets[rows]
+        lengths = self.offsets[rows + 1] - starts
+        item_owner = np.repeat(np.arange(len(rows)), lengths)
+        local_offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        ingredient_idx = np.repeat(starts, lengths) + local_offsets
+
+        amounts = self.amount_per_portion[ingredient_idx] * portions[item_owner]
+        macros = self.macros_per_portion[rows] * portions[:, None]
+        return rows, lengths, ingredient_idx, amounts, macros
+
+    def calculate(self, recipe_ids, portions, lang):
+        table = self.tables[lang]
+        rows, lengths, ingredient_idx, amounts, macros = self.scale(recipe_ids, portions)
+
+        amounts = np.round(amounts, 1).tolist()
+        macro_rows = np.round(macros, 1).tolist()
+        totals = np.round(macros.sum(axis=0), 1).tolist()
+        bounds = np.concatenate(([0], np.cumsum(lengths))).tolist()
+        ingredient_idx = ingredient_idx.tolist()
+
+        results = []
+        for i, recipe_id in enumerate(recipe_ids):
+            ingredients = [
+                {'name': table.names[idx], 'amount': amount, 'unit': table.units[idx]}
+                for idx, amount in zip(ingredient_idx[bounds[i]:bounds[i + 1]],
+                                       amounts[bounds[i]:bounds[i + 1]])
+            ]
+            results.append({
+                'recipe_id': recipe_id,
+                'portions': portions[i],
+                'ingredients': ingredients,
+                'macros': dict(zip(MACROS, macro_rows[i]))
+            })
+        return {'items': results, 'total': dict(zip(MACROS, totals))}
+
+    def shopping_list(self, recipe_ids, portions, lang):
+        # Зведений список покупок для плану харчування: один проход bincount
+        # по всіх інгредієнтах усіх рецептів плану
+        table = self.tables[lang]
+        rows, lengths, ingredient_idx, amounts, macros = self.scale(recipe_ids, portions)
+
+        key_idx = table.key_idx[ingredient_idx]
+        sums = np.bincount(key_idx, weights=amounts * table.unit_factors[ingredient_idx],
+                           minlength=len(table.keys))
+
+        used = np.unique(key_idx)
+        shopping_list = []
+        for idx, amount in zip(used.tolist(), sums[used].tolist()):
+            name, unit = table.keys[idx]
+            digits = 1
+            if unit in LARGER_UNITS and amount >= LARGER_UNITS[unit][1]:
+                unit, divisor = LARGER_UNITS[unit]
+                amount, digits = amount / divisor, 2
+            shopping_list.append({'name': name, 'amount': round(amount, digits), 'unit': unit_label(unit, lang)})
+
+        totals = np.round(macros.sum(axis=0), 1).tolist()
+        return {'items': shopping_list, 'recipes': len(recipe_ids), 'total': dict(zip(MACROS, totals))}
@@ -0,0 +1,64 @@
+import gzip
+import hashlib
+import json
+
+from i18n import localized
+
+
+# --- Офлайн-режим: пакет рецептів для service worker ---
+# Усі рецепти однією мовою в компактному JSON: назви полів записані один раз у
+# "fields", далі кожен рецепт - масив значень, а інгредієнт - [назва, кількість, одиниця].
+# Версію пакета задає застосунок (версія каталогу в базі), тож адреса з версією ніколи
+# не змінюється і може кешуватися назавжди, а зміна каталогу дає нову адресу (і новий service worker).
+
+BUNDLE_FIELDS = (
+    'id', 'category', 'base_portions', 'title', 'description', 'ingredients', 'instructions', 'image'
+)
+# Меню рецептів і список калькулятора (див. recipe_menu() в app.py) - той самий формат,
+# але лише поля для навігації, тож і без мережі меню будується з повного пакета
+MENU_FIELDS = BUNDLE_FIELDS[:4]
+HASH_LENGTH = 10
+
+
+class RecipeBundle:
+    def __init__(self, lang, data, version):
+        self.lang = lang
+        self.data = data
+        self.version = version
+        self.gzipped = gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def build_bundle(recipes, lang, default_lang, image_url, version):
+    # recipes - об'єкти Recipe (або з тими ж атрибутами), image_url(шлях) -> адреса картинки
+    rows = []
+    for recipe in recipes:
+        ingredients = localized(recipe, 'ingredients', lang, default_lang)
+        rows.append([
+            recipe.id,
+            recipe.category,
+            recipe.base_portions,
+            localized(recipe, 'title', lang, default_lang),
+            localized(recipe, 'description', lang, default_lang),
+            [[item['name'], item.get('amount', 0), item.get('unit', '')] for item in ingredients],
+            localized(recipe, 'instructions', lang, default_lang),
+            image_url(recipe.image)
+        ])
+    return _pack(lang, BUNDLE_FIELDS, rows, version)
+
+
+def build_menu(recipes, lang, default_lang, version):
+    rows = [
+        [recipe.id, recipe.category, recipe.base_portions, localized(recipe, 'title', lang, default_lang)]
+        for recipe in recipes
+    ]
+    return _pack(lang, MENU_FIELDS, rows, version)
+
+
+def _pack(lang, fields, rows, version):
+    data = json.dumps({'lang': lang, 'fields': fields, 'recipes': rows}, ensure_ascii=False, separators=(',', ':'))
+    return RecipeBundle(lang, data.encode('utf-8'), version)
+
+
+def cache_version(urls):
+    # Версія кешу service worker: змінюється разом з будь-якою адресою з передзавантаження
+    return hashlib.sha256('\n'.join(urls).encode('utf-8')).hexdigest()[:HASH_LENGTH]
@@ -0,0 +1,107 @@
+import re
+
+
+def ingredient_terms(name):
+    # "Картопля (велика)" -> ["картопля"], "Сіль, перець" -> ["сіль", "перець"]
+    name = re.sub(r'\(.*?\)', ' ', name.lower())
+    terms = []
+    for part in name.split(','):
+        words = re.findall(r'\w+', part)
+        if words:
+            terms.append(' '.join(words))
+    return terms
+
+
+def iter_bits(bits):
+    # Номери встановлених бітів; крок на кожен встановлений біт, а не на кожен розряд
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+
+class _LanguageIndex:
+    def __init__(self):
+        self.term_ids = {}              # термін -> номер біта
+        self.term_recipes = []          # номер терміну -> бітсет рядків рецептів
+        self.recipe_names = {}          # рядок рецепта -> [(бітсет терміну, назва інгредієнта)]
+
+    def _term_bit(self, term):
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            term_id = self.term_ids[term] = len(self.term_recipes)
+            self.term_recipes.append(0)
+        return term_id
+
+    def add(self, row, ingredients):
+        names = []
+        for item in ingredients:
+            # "за смаком" (сіль, спеції) не вважаємо обов'язковим інгредієнтом
+            if not item.get('amount'):
+                continue
+            item_bits = 0
+            for term in ingredient_terms(item['name']):
+                term_id = self._term_bit(term)
+                self.term_recipes[term_id] |= 1 << row
+                item_bits |= 1 << term_id
+            if item_bits:
+                names.append((item_bits, item['name']))
+        self.recipe_names[row] = names
+
+    def match_terms(self, query):
+        # Слово з комори збігається з терміном, якщо є префіксом одного з його слів:
+        # "potato" -> "potatoes", "oil" -> "olive oil"
+        words = re.findall(r'\w+', query.lower())
+        if not words:
+            return 0
+        bits = 0
+        for term, term_id in self.term_ids.items():
+            term_words = term.split()
+            if all(any(t.startswith(word) for t in term_words) for word in words):
+                bits |= 1 << term_id
+        return bits
+
+
+class PantryIndex:
+    # Інвертований індекс інгредієнт -> бітсет рецептів (біт = рядок рецепта).
+    # Запит "що приготувати з того, що є" - це об'єднання бітсетів продуктів із
+    # комори (кандидати) і для кожного кандидата кілька AND по його інгредієнтах,
+    # без розбору JSON рецептів.
+    # Індекс будується цілком (add_recipe для кожного рецепта) при зміні каталогу і
+    # далі лише читається, тож замків не потребує: новий просто замінює старий.
+    def __init__(self, languages):
+        self.languages = languages
+        self._indexes = {lang: _LanguageIndex() for lang in languages}
+        self._id_by_row = []
+
+    def add_recipe(self, recipe):
+        row = len(self._id_by_row)
+        self._id_by_row.append(recipe.id)
+        for lang, index in self._indexes.items():
+            index.add(row, getattr(recipe, f'ingredients_{lang}') or [])
+
+    def rank(self, pantry, lang, limit=10):
+        index = self._indexes[lang]
+        have = 0
+        for item in pantry:
+            have |= index.match_terms(item)
+        if not have:
+            return []
+
+        candidates = 0
+        for term_id in iter_bits(have):
+            candidates |= index.term_recipes[term_id]
+
+        results = []
+        for row in iter_bits(candidates):
+            total = len(index.recipe_names[row])
+            missing = [name for bits, name in index.recipe_names[row] if not bits & have]
+            results.append({
+                'recipe_id': self._id_by_row[row],
+                'coverage': round((total - len(missing)) / total, 3) if total else 0.0,
+                'matched': total - len(missing),
+                'missing': missing
+            })
+
+        results.sort(key=lambda r: (-r['coverage'], len(r['missing']), r['recipe_id']))
+        return results[:limit]
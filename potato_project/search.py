@@ -0,0 +1,136 @@
+import re
+
+from sqlalchemy import text
+
+
+# --- Повнотекстовий пошук (SQLite FTS5) ---
+# recipe_fts дублює текстові поля рецептів обома мовами плюс назви інгредієнтів
+# з JSON-колонок, review_fts - тексти відгуків. Обидві таблиці підтримуються
+# тригерами, тож код, що пише в recipe/review, про пошук нічого не знає.
+# unicode61 коректно переводить у нижній регістр кирилицю, а prefix-індекси
+# роблять пошук за початком слова ("борщ*") таким же швидким, як за цілим словом.
+
+_INGREDIENT_NAMES = "(SELECT group_concat(json_extract(value, '$.name'), ' ') FROM json_each({}))"
+
+_RECIPE_FTS_VALUES = """
+    {row}.id, {row}.title_uk, {row}.title_en, {row}.description_uk, {row}.description_en,
+    {row}.instructions_uk, {row}.instructions_en,
+    """ + _INGREDIENT_NAMES.format('{row}.ingredients_uk') + """,
+    """ + _INGREDIENT_NAMES.format('{row}.ingredients_en')
+
+_RECIPE_FTS_COLUMNS = """rowid, title_uk, title_en, description_uk, description_en,
+    instructions_uk, instructions_en, ingredients_uk, ingredients_en"""
+
+SEARCH_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS recipe_fts USING fts5(
+        title_uk, title_en, description_uk, description_en,
+        instructions_uk, instructions_en, ingredients_uk, ingredients_en,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3 4'
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS review_fts USING fts5(
+        text, recipe_id UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3 4'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS recipe_fts_insert AFTER INSERT ON recipe BEGIN
+        INSERT INTO recipe_fts ({_RECIPE_FTS_COLUMNS}) VALUES ({_RECIPE_FTS_VALUES.format(row='new')});
+    END
+    """,
+    # Лише при зміні текстових колонок: оновлення лічильників відгуків
+    # (review_count, photo_count) не переіндексовує рецепт
+    f"""
+    CREATE TRIGGER IF NOT EXISTS recipe_fts_update
+    AFTER UPDATE OF id, title_uk, title_en, description_uk, description_en,
+        instructions_uk, instructions_en, ingredients_uk, ingredients_en ON recipe BEGIN
+        DELETE FROM recipe_fts WHERE rowid = old.id;
+        INSERT INTO recipe_fts ({_RECIPE_FTS_COLUMNS}) VALUES ({_RECIPE_FTS_VALUES.format(row='new')});
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS recipe_fts_delete AFTER DELETE ON recipe BEGIN
+        DELETE FROM recipe_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS review_fts_insert AFTER INSERT ON review BEGIN
+        INSERT INTO review_fts (rowid, text, recipe_id) VALUES (new.id, new.text, new.recipe_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS review_fts_update AFTER UPDATE ON review BEGIN
+        DELETE FROM review_fts WHERE rowid = old.id;
+        INSERT INTO review_fts (rowid, text, recipe_id) VALUES (new.id, new.text, new.recipe_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS review_fts_delete AFTER DELETE ON review BEGIN
+        DELETE FROM review_fts WHERE rowid = old.id;
+    END
+    """,
+]
+
+# Вага колонок для bm25: назва важливіша за інгредієнти, а ті - за інструкцію
+_RECIPE_WEIGHTS = '10.0, 10.0, 4.0, 4.0, 1.0, 1.0, 6.0, 6.0'
+
+
+def init_search(connection):
+    # Створює таблиці/тригери і, якщо індекс порожній, заповнює його з уже наявних рядків
+    for statement in SEARCH_SCHEMA:
+        connection.execute(text(statement))
+
+    if connection.execute(text('SELECT count(*) FROM recipe_fts')).scalar() == 0:
+        connection.execute(text(
+            f"INSERT INTO recipe_fts ({_RECIPE_FTS_COLUMNS}) "
+            f"SELECT {_RECIPE_FTS_VALUES.format(row='recipe')} FROM recipe"
+        ))
+    if connection.execute(text('SELECT count(*) FROM review_fts')).scalar() == 0:
+        connection.execute(text(
+            'INSERT INTO review_fts (rowid, text, recipe_id) SELECT id, text, recipe_id FROM review'
+        ))
+
+
+def reindex_recipes(connection, ids_query):
+    # Масове оновлення recipe_fts для рецептів з ids_query (SELECT id ...):
+    # імпорт каталогу вимикає тригери на час пачки і переіндексує її одним запитом
+    connection.execute(text(f'DELETE FROM recipe_fts WHERE rowid IN ({ids_query})'))
+    connection.execute(text(
+        f"INSERT INTO recipe_fts ({_RECIPE_FTS_COLUMNS}) "
+        f"SELECT {_RECIPE_FTS_VALUES.format(row='recipe')} FROM recipe WHERE recipe.id IN ({ids_query})"
+    ))
+
+
+def build_match_query(query):
+    # Користувацький ввід не передаємо в MATCH як є (лапки, NEAR, * тощо мають
+    # там особливе значення): кожне слово береться в лапки як префікс
+    words = re.findall(r'\w+', query.lower())[:8]
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search_recipes(session, query, limit=20):
+    # Повертає [(recipe_id, джерело збігу)], спершу найкращі збіги в самих рецептах,
+    # потім рецепти, знайдені лише через відгуки
+    match = build_match_query(query)
+    if not match:
+        return []
+
+    recipe_hits = session.execute(text(
+        f'SELECT rowid FROM recipe_fts WHERE recipe_fts MATCH :match '
+        f'ORDER BY bm25(recipe_fts, {_RECIPE_WEIGHTS}) LIMIT :limit'
+    ), {'match': match, 'limit': limit}).scalars().all()
+    results = [(recipe_id, 'recipe') for recipe_id in recipe_hits]
+
+    if len(results) < limit:
+        review_hits = session.execute(text(
+            'SELECT recipe_id FROM review_fts WHERE review_fts MATCH :match '
+            'GROUP BY recipe_id ORDER BY min(rank) LIMIT :limit'
+        ), {'match': match, 'limit': limit}).scalars().all()
+        seen = set(recipe_hits)
+        results += [(int(recipe_id), 'review') for recipe_id in review_hits if int(recipe_id) not in seen]
+
+    return results[:limit]
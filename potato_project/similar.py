@@ -0,0 +1,158 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+
+# --- Схожі рецепти ("вам також може сподобатися") ---
+# Вектор рецепта складається з трьох частин: інгредієнти (id з довідника ingredient
+# з вагою IDF, хешовані у фіксовану кількість вимірів), категорія (one-hot) і профіль
+# БЖУ. Косинусна схожість рахується блоками матричних множень, і для кожного рецепта
+# зберігаються k найближчих. Таблиця лежить у .npy, де номер рядка - id рецепта,
+# тож відповідь на запит - одне звертання за індексом до memory-mapped файла.
+# Воркери лише читають таблицю; пише її тільки повна перебудова (команда
+# rebuild-similar, імпорт каталогу), яка атомарно замінює файл.
+
+INGREDIENT_WEIGHT = 1.0
+CATEGORY_WEIGHT = 0.5
+MACRO_WEIGHT = 0.5
+
+_HASH_MULTIPLIER = 2654435761  # розкидає сусідні id інгредієнтів по різних вимірах
+
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+
+def build_vectors(recipes, ingredient_rows, macro_totals, dim=1024):
+    # recipes: [(id, категорія)], ingredient_rows: [(recipe_id, ingredient_id)],
+    # macro_totals: [(recipe_id, p, f, c)] -> (масив id, нормовані вектори N x D)
+    ids = np.array([recipe_id for recipe_id, _ in recipes], dtype=np.int64)
+    row_by_id = {recipe_id: row for row, (recipe_id, _) in enumerate(recipes)}
+    n = len(ids)
+
+    ingredients = np.zeros((n, dim), dtype=np.float32)
+    pairs = np.array(
+        [(row_by_id[recipe_id], ingredient_id) for recipe_id, ingredient_id in ingredient_rows
+         if recipe_id in row_by_id],
+        dtype=np.int64
+    ).reshape(-1, 2)
+    if len(pairs):
+        pairs = np.unique(pairs, axis=0)  # повтор інгредієнта в рецепті рахуємо один раз
+        # IDF: сіль чи цибуля є майже всюди і про схожість рецептів кажуть мало
+        feature_ids, document_counts = np.unique(pairs[:, 1], return_counts=True)
+        idf = np.log((n + 1) / (document_counts + 1)) + 1
+        weights = idf[np.searchsorted(feature_ids, pairs[:, 1])]
+        np.add.at(ingredients, (pairs[:, 0], pairs[:, 1] * _HASH_MULTIPLIER % dim), weights)
+
+    categories = sorted({category for _, category in recipes})
+    category_column = {category: column for column, category in enumerate(categories)}
+    category_block = np.zeros((n, len(categories)), dtype=np.float32)
+    category_block[np.arange(n), [category_column[category] for _, category in recipes]] = 1
+
+    macros = np.zeros((n, 3), dtype=np.float32)
+    for recipe_id, p, f, c in macro_totals:
+        if recipe_id in row_by_id:
+            macros[row_by_id[recipe_id]] = (p, f, c)
+
+    vectors = np.hstack([
+        _normalize_rows(ingredients) * INGREDIENT_WEIGHT,
+        category_block * CATEGORY_WEIGHT,
+        _normalize_rows(macros) * MACRO_WEIGHT,
+    ])
+    return ids, _normalize_rows(vectors).astype(np.float32)
+
+
+def top_k(vectors, k, block_size=1024):
+    # k найближчих для кожного рядка -> (номери рядків, схожість); якщо рецептів
+    # менше за k + 1, решта позицій заповнена -1 / 0. Лише для повної перебудови:
+    # новий рецепт міняє IDF інгредієнтів і сусідів інших рецептів, тож перерахунок
+    # частини рядків дав би таблицю, несумісну з рештою
+    n = len(vectors)
+    neighbors = np.full((n, k), -1, dtype=np.int64)
+    scores = np.zeros((n, k), dtype=np.float32)
+    count = min(k, n - 1)
+    if count <= 0:
+        return neighbors, scores
+
+    for start in range(0, n, block_size):
+        block = np.arange(start, min(start + block_size, n))
+        similarity = vectors[block] @ vectors.T
+        similarity[np.arange(len(block)), block] = -np.inf  # сам собі не сусід
+        candidates = np.argpartition(-similarity, count - 1, axis=1)[:, :count]
+        candidate_scores = np.take_along_axis(similarity, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1, kind='stable')
+        neighbors[start:start + len(block), :count] = np.take_along_axis(candidates, order, axis=1)
+        scores[start:start + len(block), :count] = np.take_along_axis(candidate_scores, order, axis=1)
+    return neighbors, scores
+
+
+class SimilarRecipes:
+    # Файл - структурований масив: рядок = id рецепта, у ньому id сусідів (0 - порожньо)
+    # та їх схожість (float16 - для порядку і показу досить). Воркери gunicorn
+    # відкривають один і той самий файл лише для читання, тож ОС тримає в пам'яті одну його копію.
+    def __init__(self, path, k=6):
+        self.path = path
+        self.k = k
+        self.dtype = np.dtype([('ids', '<i4', (k,)), ('scores', '<f2', (k,))])
+        self._table = None
+        self._file_key = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def table(self):
+        # Повна перебудова (можливо, в іншому процесі) замінює файл новим, тож
+        # раз на секунду перевіряємо, чи не час відкрити його заново
+        now = time.monotonic()
+        if self._table is not None and now - self._checked_at < 1.0:
+            return self._table
+        with self._lock:
+            self._checked_at = now
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                self._table = self._file_key = None
+                return None
+            file_key = (stat.st_ino, stat.st_size)
+            if file_key != self._file_key:
+                table = np.load(self.path, mmap_mode='r')
+                self._table = table if table.dtype == self.dtype else None
+                self._file_key = file_key
+            return self._table
+
+    def lookup(self, recipe_id):
+        # -> [(id, схожість)] від найсхожішого
+        table = self.table()
+        if table is None or not 0 <= recipe_id < len(table):
+            return []
+        entry = table[recipe_id]
+        return [(int(neighbor), float(score)) for neighbor, score in zip(entry['ids'], entry['scores']) if neighbor]
+
+    def rebuild(self, ids, vectors):
+        size = int(ids.max()) + 1 if len(ids) else 1
+        table = np.zeros(size, dtype=self.dtype)
+        neighbors, scores = top_k(vectors, self.k)
+        table['ids'][ids] = np.where(neighbors >= 0, ids[np.maximum(neighbors, 0)], 0)
+        table['scores'][ids] = scores
+
+        # Пишемо поруч і перейменовуємо: процеси, що читають старий файл, не бачать напівзаписаного.
+        # Звичайний open (не mkstemp з його 0600) - права файла визначає umask, як для будь-якого іншого
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temp_path = f'{self.path}.{os.getpid()}.part'
+        try:
+            with open(temp_path, 'wb') as f:
+                np.save(f, table)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        with self._lock:
+            self._table = self._file_key = None
+        return len(ids)
@@ -0,0 +1,199 @@
+// Service worker книги рецептів. Файл генерується сервером (див. service_worker() в app.py):
+// список передзавантаження містить адреси з хешем вмісту, тож новий стиль, картинка
+// чи каталог рецептів дають новий файл, і браузер встановлює нову версію.
+const VERSION = {{ version | tojson }};
+const SHELL_URL = {{ shell_url | tojson }};
+const PRECACHE_URLS = {{ precache | tojson }};
+
+const PRECACHE = `recipes-precache-${VERSION}`;
+const PAGES = `recipes-pages-${VERSION}`;
+const REVIEWS = 'recipes-reviews';
+const ASSETS = 'recipes-assets';
+const REVIEW_SYNC_TAG = 'review-queue';
+
+// Запити, після яких оболонка і панелі виглядають інакше (вхід, мова, профіль)
+const SESSION_PATHS = ['/logout', '/set_lang/'];
+const PANEL_PATH = /^\/recipe\/\d+\/panel$/;
+const REVIEWS_PATH = /^\/api\/recipes\/\d+\/reviews$/;
+const MENU_PATH = /^\/api\/recipes\/menu\.\w+\.json$/;
+const ADD_REVIEW_PATH = /^\/add_review\/\d+$/;
+
+self.addEventListener('install', event => {
+    event.waitUntil(Promise.all([
+        caches.open(PRECACHE).then(cache => cache.addAll(PRECACHE_URLS)),
+        fetch(SHELL_URL).then(response => storeResponse(PAGES, SHELL_URL, response)).catch(() => {})
+    ]).then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', event => {
+    const keep = [PRECACHE, PAGES, REVIEWS, ASSETS];
+    event.waitUntil(
+        caches.keys()
+            .then(names => Promise.all(
+                names.filter(name => name.startsWith('recipes-') && !keep.includes(name))
+                     .map(name => caches.delete(name))
+            ))
+            .then(() => self.clients.claim())
+            .then(() => flushReviews().catch(() => {}))
+    );
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin) return;
+
+    if (request.method !== 'GET') {
+        if (request.mode === 'navigate' && ADD_REVIEW_PATH.test(url.pathname)) {
+            event.respondWith(submitReview(request));
+        } else if (request.mode === 'navigate') {
+            event.respondWith(caches.delete(PAGES).then(() => fetch(request)));
+        }
+        return;
+    }
+
+    if (SESSION_PATHS.some(path => url.pathname.startsWith(path))) {
+        event.respondWith(caches.delete(PAGES).then(() => fetch(request)));
+    } else if (PRECACHE_URLS.includes(url.pathname + url.search)) {
+        event.respondWith(cacheFirst(PRECACHE, request));
+    } else if (url.pathname.startsWith('/offline/')) {
+        // Збережена оболонка може посилатися на попередню версію пакета
+        event.respondWith(fetch(request).catch(() => matchCache(PRECACHE, request, { ignoreSearch: true })));
+    } else if (url.pathname.startsWith('/assets/')) {
+        event.respondWith(cacheFirst(ASSETS, request));
+    } else if (url.pathname === SHELL_URL && request.mode === 'navigate') {
+        // Сторінки з ?error_tab одноразові: лише мережа, а без неї - збережена оболонка
+        event.respondWith(url.search
+            ? fetch(request).catch(() => matchCache(PAGES, SHELL_URL))
+            : staleWhileRevalidate(event, PAGES));
+    } else if (MENU_PATH.test(url.pathname)) {
+        // Адреса меню містить версію каталогу: збережена відповідь не застаріває
+        event.respondWith(cacheFirst(PAGES, request));
+    } else if (PANEL_PATH.test(url.pathname)) {
+        event.respondWith(staleWhileRevalidate(event, PAGES));
+    } else if (REVIEWS_PATH.test(url.pathname)) {
+        event.respondWith(staleWhileRevalidate(event, REVIEWS));
+    }
+});
+
+self.addEventListener('sync', event => {
+    if (event.tag === REVIEW_SYNC_TAG) {
+        event.waitUntil(flushReviews());
+    }
+});
+
+// Браузери без Background Sync: сторінка просить надіслати чергу при завантаженні
+// і при поверненні зв'язку
+self.addEventListener('message', event => {
+    if (event.data && event.data.type === 'flush-reviews') {
+        event.waitUntil(flushReviews().catch(() => {}));
+    }
+});
+
+
+// --- Стратегії кешування ---
+
+function matchCache(cacheName, request, options = {}) {
+    // Vary: Cookie тут не допомагає (cookie в service worker не видно), тому кеш
+    // сторінок просто скидається при вході, виході чи зміні мови
+    return caches.open(cacheName).then(cache => cache.match(request, { ignoreVary: true, ...options }));
+}
+
+function storeResponse(cacheName, request, response) {
+    // Лише повні успішні відповіді; no-store (сторінки з flash-повідомленнями) не зберігаємо
+    if (response.ok && !/no-store/.test(response.headers.get('Cache-Control') || '')) {
+        const copy = response.clone();
+        return caches.open(cacheName).then(cache => cache.put(request, copy)).then(() => response);
+    }
+    return Promise.resolve(response);
+}
+
+function cacheFirst(cacheName, request) {
+    return matchCache(cacheName, request).then(cached =>
+        cached || fetch(request).then(response => storeResponse(cacheName, request, response))
+    );
+}
+
+function staleWhileRevalidate(event, cacheName) {
+    // Збережена копія віддається одразу, а свіжа (дешевий 304 за ETag, якщо нічого
+    // не змінилося) оновлює кеш у фоні для наступного разу
+    const request = event.request;
+    const network = fetch(request).then(response => storeResponse(cacheName, request, response));
+    event.waitUntil(network.catch(() => {}));
+    return matchCache(cacheName, request).then(cached => cached || network);
+}
+
+
+// --- Черга відгуків, надісланих без зв'язку (IndexedDB) ---
+
+function withQueue(mode, action) {
+    return new Promise((resolve, reject) => {
+        const open = indexedDB.open('recipes-offline', 1);
+        open.onupgradeneeded = () => open.result.createObjectStore('reviews', { keyPath: 'id', autoIncrement: true });
+        open.onerror = () => reject(open.error);
+        open.onsuccess = () => {
+            const db = open.result;
+            const transaction = db.transaction('reviews', mode);
+            const result = action(transaction.objectStore('reviews'));
+            transaction.oncomplete = () => {
+                db.close();
+                resolve(result.result);
+            };
+            transaction.onerror = transaction.onabort = () => {
+                db.close();
+                reject(transaction.error);
+            };
+        };
+    });
+}
+
+function submitReview(request) {
+    const copy = request.clone();
+    return fetch(request).catch(() =>
+        copy.formData()
+            .then(form => withQueue('readwrite', store => store.add({
+                url: copy.url,
+                author: form.get('author_id'),
+                fields: Array.from(form.entries()),
+                queuedAt: Date.now()
+            })))
+            .then(() => self.registration.sync && self.registration.sync.register(REVIEW_SYNC_TAG).catch(() => {}))
+            .then(() => Response.redirect(`${SHELL_URL}#review-queued`, 303))
+    );
+}
+
+function sendReview(entry) {
+    const form = new FormData();
+    entry.fields.forEach(([name, value]) => {
+        if (value instanceof File) form.append(name, value, value.name);
+        else form.append(name, value);
+    });
+    const headers = { 'X-Review-Replay': '1' };
+    return fetch(entry.url, { method: 'POST', body: form, credentials: 'same-origin', headers }).then(response => {
+        // 409 - у браузері увійшов інший користувач (entry.author): відгук чекає свого
+        // автора, а решта черги надсилається далі
+        if (response.status === 409) return;
+        // 204 - відгук збережено; інші 4xx (порожній текст, невідомий рецепт) повтор
+        // не виправить - відгук відкидається
+        if (response.status === 204 || (response.status >= 400 && response.status < 500)) {
+            return withQueue('readwrite', store => store.delete(entry.id));
+        }
+        // Решта - невдача, і відгук лишається в черзі: 503 (черга відгуків на сервері
+        // переповнена), інші 5xx, редирект login_required на сторінку входу
+        throw new Error(`review not sent: ${response.status}`);
+    });
+}
+
+let flushing = null;
+function flushReviews() {
+    // По одному і по черзі, щоб відгуки зберігалися в тому ж порядку; помилка
+    // зупиняє прохід, і решта чекає наступної синхронізації
+    if (!flushing) {
+        flushing = withQueue('readonly', store => store.getAll())
+            .then(entries => entries.reduce((chain, entry) => chain.then(() => sendReview(entry)), Promise.resolve()))
+            .finally(() => {
+                flushing = null;
+            });
+    }
+    return flushing;
+}
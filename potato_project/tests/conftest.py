@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Модулі застосунку лежать пласко в potato_project/ - робимо їх доступними для import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+import migrations
+
+
+def _create_notes(connection):
+    connection.execute(text('CREATE TABLE note (id INTEGER PRIMARY KEY, body TEXT)'))
+
+
+def _broken_step(connection):
+    connection.execute(text('CREATE TABLE half_done (id INTEGER PRIMARY KEY)'))
+    connection.execute(text(
+        'CREATE TRIGGER half_done_insert AFTER INSERT ON note BEGIN '
+        'INSERT INTO half_done (id) VALUES (new.id); END'
+    ))
+    raise RuntimeError('міграція впала посередині')
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    yield engine
+    engine.dispose()
+
+
+def test_failed_migration_leaves_no_schema_behind(engine, monkeypatch):
+    monkeypatch.setattr(migrations, 'MIGRATIONS', [
+        (1, 'нотатки', _create_notes),
+        (2, 'зламана', _broken_step),
+    ])
+
+    with pytest.raises(RuntimeError):
+        migrations.run_migrations(engine)
+
+    with engine.connect() as connection:
+        assert migrations.schema_version(connection) == 1
+        triggers = connection.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'")).all()
+    assert 'half_done' not in inspect(engine).get_table_names()
+    assert 'note' in inspect(engine).get_table_names()
+    assert triggers == []
+
+
+def _create_half_done(connection):
+    connection.execute(text('CREATE TABLE half_done (id INTEGER PRIMARY KEY)'))
+
+
+def test_fixed_migration_applies_on_next_start(engine, monkeypatch):
+    monkeypatch.setattr(migrations, 'MIGRATIONS', [(1, 'нотатки', _create_notes), (2, 'зламана', _broken_step)])
+    with pytest.raises(RuntimeError):
+        migrations.run_migrations(engine)
+
+    # Після виправлення міграція стартує з чистої бази, а не падає на вже створених об'єктах
+    monkeypatch.setattr(migrations, 'MIGRATIONS', [(1, 'нотатки', _create_notes), (2, 'виправлена', _create_half_done)])
+    assert migrations.run_migrations(engine) == [2]
+    assert migrations.run_migrations(engine) == []
+    with engine.connect() as connection:
+        assert migrations.schema_version(connection) == 2
@@ -0,0 +1,119 @@
+import pytest
+from sqlalchemy import event
+
+
+# Скільки SQL-запитів коштує сторінка. Кеш сторінок вимкнено, тож рахується
+# справжній рендер; число не повинно залежати ні від розміру каталогу, ні від
+# кількості відгуків (N+1 на авторах відгуків, рецепти в оболонці тощо)
+
+@pytest.fixture(scope='module')
+def recipes(tmp_path_factory):
+    folder = tmp_path_factory.mktemp('recipes')
+    with pytest.MonkeyPatch.context() as patch:
+        # Параметри читаються під час імпорту app (RECIPES_*, значення - JSON)
+        patch.setenv('RECIPES_SQLALCHEMY_DATABASE_URI', f"sqlite:///{folder / 'recipes.db'}")
+        patch.setenv('RECIPES_SIMILAR_FILE', str(folder / 'similar.npy'))
+        patch.setenv('RECIPES_ASSETS_FOLDER', str(folder / 'dist'))
+        patch.setenv('RECIPES_PAGE_CACHE_ENABLED', 'false')
+        import app as recipes
+    recipes.populate_db_if_empty()
+    return recipes
+
+
+@pytest.fixture
+def statements(recipes):
+    executed = []
+
+    def record(connection, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    with recipes.app.app_context():
+        engine = recipes.db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    yield executed
+    event.remove(engine, 'before_cursor_execute', record)
+
+
+def count_queries(client, statements, url, **kwargs):
+    statements.clear()
+    response = client.get(url, **kwargs)
+    assert response.status_code in (200, 304), response.status_code
+    return len(statements), response
+
+
+def add_reviews(recipes, recipe_id, count):
+    with recipes.app.app_context():
+        users = [
+            recipes.User(email=f'reviewer{recipe_id}-{i}@example.com', password_hash='-', first_name=f'R{i}')
+            for i in range(3)
+        ]
+        recipes.db.session.add_all(users)
+        recipes.db.session.flush()
+        recipes.db.session.add_all([
+            recipes.Review(text=f'відгук {i}', recipe_id=recipe_id, user_id=users[i % len(users)].id)
+            for i in range(count)
+        ])
+        recipes.db.session.commit()
+
+
+def test_index_shell_is_one_query(recipes, statements):
+    client = recipes.app.test_client()
+    queries, response = count_queries(client, statements, '/')
+    # Лише версія вмісту: меню рецептів довантажується окремо
+    assert queries == 1
+    assert b'recipe-select' in response.data
+
+
+def test_index_for_user_adds_only_user_lookup(recipes, statements):
+    add_reviews(recipes, 2, 1)
+    client = recipes.app.test_client()
+    with recipes.app.app_context():
+        user_id = recipes.User.query.filter_by(email='reviewer2-0@example.com').one().id
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+    recipes.identity_cache.clear()
+
+    queries, _ = count_queries(client, statements, '/')
+    assert queries == 2
+    # Далі користувач береться з кешу процесу
+    queries, _ = count_queries(client, statements, '/')
+    assert queries == 1
+
+
+def test_panel_queries_do_not_grow_with_reviews(recipes, statements):
+    client = recipes.app.test_client()
+    # версія, рецепт, перша сторінка відгуків з авторами, назви схожих рецептів
+    before, _ = count_queries(client, statements, '/recipe/1/panel')
+    assert before == 4
+
+    add_reviews(recipes, 1, 8)
+    after, response = count_queries(client, statements, '/recipe/1/panel')
+    assert after == before
+    assert 'відгук 7'.encode() in response.data
+
+
+def test_reviews_api_is_two_queries(recipes, statements):
+    add_reviews(recipes, 3, 6)
+    client = recipes.app.test_client()
+    queries, response = count_queries(client, statements, '/api/recipes/3/reviews')
+    assert queries == 2
+    assert len(response.get_json()['reviews']) == 6
+
+
+def test_revalidated_panel_is_one_query(recipes, statements):
+    client = recipes.app.test_client()
+    _, response = count_queries(client, statements, '/recipe/4/panel')
+    queries, response = count_queries(client, statements, '/recipe/4/panel', headers={'If-None-Match': response.headers['ETag']})
+    assert response.status_code == 304
+    assert queries == 1
+
+
+def test_recipe_menu_is_built_once_per_catalog_version(recipes, statements):
+    client = recipes.app.test_client()
+    recipes._recipe_menus.clear()
+    url = '/api/recipes/menu.uk.json'
+    queries, response = count_queries(client, statements, url)
+    assert queries == 2
+    assert len(response.get_json()['recipes']) == 14
+    queries, _ = count_queries(client, statements, url)
+    assert queries == 1
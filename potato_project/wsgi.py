@@ -0,0 +1,49 @@
+from app import (
+    app, db, populate_db_if_empty, password_pool, image_pipeline, review_hub, review_queue, DEV_SECRET_KEY
+)
+
+
+# --- Точка входу для продакшн-сервера ---
+# gunicorn -c gunicorn.conf.py            (Linux / macOS, див. gunicorn.conf.py)
+# waitress-serve --call wsgi:create_app   (Windows)
+# Flask - WSGI-застосунок, тож ASGI-сервер (uvicorn) дав би лише зайвий шар адаптера.
+
+_prepared = False
+
+
+def create_app(prepare_db=None):
+    # Підготовка бази (міграції, початкові рецепти) виконується один раз на процес.
+    # З preload_app = True gunicorn викликає create_app() у майстер-процесі,
+    # тож воркери стартують з уже готовою базою і не повторюють цю роботу.
+    global _prepared
+    if not app.debug and app.secret_key == DEV_SECRET_KEY:
+        raise RuntimeError('Задайте RECIPES_SECRET_KEY: ключ розробки не можна використовувати в продакшні')
+
+    if prepare_db is None:
+        prepare_db = app.config['PREPARE_DB_ON_STARTUP']
+    if prepare_db and not _prepared:
+        populate_db_if_empty()
+        _prepared = True
+    return app
+
+
+def after_fork():
+    # З'єднання з пулу, відкриті в майстер-процесі, не можна ділити між процесами:
+    # воркер забуває їх (не закриваючи) і відкриває власні
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def close_streams():
+    # Перший крок зупинки (SIGTERM, див. gunicorn.conf.py): SSE-стріми завершуються,
+    # клієнти перепідключаються до іншого воркера, звільнені потоки дообслуговують решту
+    review_hub.close()
+
+
+def shutdown(timeout=None):
+    # Плавна зупинка воркера: закрити SSE-стріми (клієнти перепідключаться до іншого
+    # воркера), зберегти відгуки з черги запису, дообробити фото і закрити пул bcrypt
+    review_hub.close()
+    review_queue.join(timeout)
+    image_pipeline.join(timeout)
+    password_pool.shutdown()